@@ -0,0 +1,46 @@
+"""Бенчмарк вывода популяции GA: цикл по отдельным SnakeNet против одного batched matmul.
+
+Запуск: python benchmarks/bench_population.py
+"""
+import os
+import sys
+import time
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.ai.model import SnakeNet, population_forward
+from src.ai.ga_trainer import GATrainer
+
+def bench(fn, repeats):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - t0) / repeats
+
+def main(repeats=20, seed=0):
+    torch.set_num_threads(1)
+    print(f"{'population':>10}{'loop ms':>12}{'batched ms':>12}{'speedup':>10}{'agree':>8}")
+    for size in (10, 100, 1000):
+        ga = GATrainer(SnakeNet, population_size=size, seed=seed)
+        models = [ga.get_model(1, i) for i in range(size)]
+        weights = ga.stacked_weights(1)
+        idx = np.arange(size)
+        x = torch.from_numpy(np.random.default_rng(seed).integers(0, 2, size=(size, 11)).astype(np.float32))
+
+        def loop():
+            with torch.no_grad():
+                return torch.cat([m(x[i:i + 1]) for i, m in enumerate(models)])
+
+        def batched():
+            with torch.no_grad():
+                return population_forward(weights, idx, x)
+
+        loop_t = bench(loop, repeats)
+        batched_t = bench(batched, repeats)
+        agree = (loop().argmax(dim=1) == batched().argmax(dim=1)).float().mean().item()
+        print(f"{size:>10}{loop_t * 1e3:>12.3f}{batched_t * 1e3:>12.3f}{loop_t / batched_t:>10.1f}{agree:>8.2f}")
+
+if __name__ == "__main__":
+    main()
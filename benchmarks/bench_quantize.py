@@ -0,0 +1,69 @@
+"""Бенчмарк квантованных весов SnakeNet: совпадение действий с float32, память и скорость.
+
+Популяция GA квантуется в float16 и int8 с масштабом на тензор; каждая особь оценивается
+на признаках из реальной игры, как в воркерах ParallelEvaluator (dequantize + NumpySnakeNet).
+
+Запуск: python benchmarks/bench_quantize.py
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.config import SETTINGS
+from src.core.engine import GameEngine
+from src.input.strategies import MultiAgentStrategy
+from src.ai.model import SnakeNet
+from src.ai.ga_trainer import GATrainer
+from src.ai.numpy_net import NumpySnakeNet
+from src.ai.quantize import quantize, dequantize
+
+def collect_sensors(steps=500, seed=0):
+    import dataclasses
+    config = dataclasses.replace(SETTINGS, stats_enabled=False)
+    engine = GameEngine(config, seed)
+    strategy = MultiAgentStrategy(config, seed)
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(steps):
+        sensors = strategy.get_sensors_batch(engine.get_state())
+        rows.append(sensors)
+        actions = rng.integers(0, 3, size=len(engine.snakes))
+        for snake, action in zip(engine.snakes, actions):
+            snake.set_direction(strategy._transform_action(snake, action))
+        engine.step(actions)
+    # Без удаления повторов: совпадение взвешено частотой состояний в игре
+    return np.concatenate(rows)
+
+def main(sizes=(100, 1000)):
+    x = collect_sensors()
+    print(f"game states: {len(x)}")
+    print(f"{'population':>10}{'dtype':>9}{'MB':>9}{'agree':>8}{'quantize ms':>13}{'load+act us':>13}")
+    for size in sizes:
+        ga = GATrainer(SnakeNet, population_size=size, seed=size)
+        pop, layout = ga.population, ga.layout
+        net = NumpySnakeNet.from_flat(pop[0], layout)
+        reference = np.stack([net.refresh_flat(row, layout).act(x) for row in pop])
+
+        for dtype in ('float32', 'float16', 'int8'):
+            t0 = time.perf_counter()
+            values, scales = quantize(pop, layout, dtype)
+            quantize_t = time.perf_counter() - t0
+
+            actions = np.stack([
+                net.refresh_quantized(values[i], scales[i], layout).act(x) for i in range(size)
+            ])
+            agree = (actions == reference).mean()
+
+            # Как в воркере: восстановить особь и выбрать одно действие
+            t0 = time.perf_counter()
+            for i in range(size):
+                net.refresh_flat(dequantize(values[i], scales[i], layout), layout).act(x[i % len(x)])
+            load_t = (time.perf_counter() - t0) / size
+
+            mb = (values.nbytes + scales.nbytes) / 2 ** 20
+            print(f"{size:>10}{dtype:>9}{mb:>9.2f}{agree:>8.4f}{quantize_t * 1e3:>13.2f}{load_t * 1e6:>13.1f}")
+
+if __name__ == "__main__":
+    main()
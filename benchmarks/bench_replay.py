@@ -0,0 +1,54 @@
+"""Микробенчмарк PrioritizedReplayBuffer: выборка и обновление приоритетов.
+
+Запуск: python benchmarks/bench_replay.py
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.ai.replay import ReplayBuffer, PrioritizedReplayBuffer
+
+def fill(buffer, rng, state_size=11, chunk=100_000):
+    while len(buffer) < buffer.capacity:
+        n = min(chunk, buffer.capacity - len(buffer))
+        buffer.push_batch(
+            rng.random((n, state_size), dtype=np.float32),
+            rng.integers(0, 3, n),
+            rng.random(n, dtype=np.float32),
+            rng.random((n, state_size), dtype=np.float32),
+            np.zeros(n, dtype=np.float32),
+        )
+
+def bench(buffer, batch_size, repeats, rng):
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        idx = buffer.sample_indices(batch_size)
+        buffer.get(idx)
+    sample_t = (time.perf_counter() - t0) / repeats
+
+    update_t = 0.0
+    if isinstance(buffer, PrioritizedReplayBuffer):
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            idx = buffer.sample_indices(batch_size)
+            buffer.weights(idx)
+            buffer.update_priorities(idx, rng.random(batch_size))
+        update_t = (time.perf_counter() - t0) / repeats - sample_t
+    return sample_t, update_t
+
+def main(batch_size=256, repeats=500, seed=0):
+    print(f"batch_size={batch_size}, repeats={repeats}")
+    print(f"{'buffer':<12}{'capacity':>10}{'sample us':>12}{'update us':>12}{'samples/s':>14}")
+    for capacity in (100_000, 1_000_000):
+        for buffer_class in (ReplayBuffer, PrioritizedReplayBuffer):
+            rng = np.random.default_rng(seed)
+            buffer = buffer_class(capacity, seed=seed)
+            fill(buffer, rng)
+            sample_t, update_t = bench(buffer, batch_size, repeats, rng)
+            name = "uniform" if buffer_class is ReplayBuffer else "prioritized"
+            print(f"{name:<12}{capacity:>10}{sample_t * 1e6:>12.1f}{update_t * 1e6:>12.1f}{batch_size / sample_t:>14.0f}")
+
+if __name__ == "__main__":
+    main()
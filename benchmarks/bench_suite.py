@@ -0,0 +1,289 @@
+"""Набор бенчмарков: движок, сенсоры, вывод моделей, обучение и отрисовка.
+
+Каждый случай - (группа, параметры) с фиксированным seed; время на вызов и вызовы в секунду
+пишутся в JSON. С --baseline результаты сравниваются с сохранённым файлом, и случаи,
+ставшие медленнее порога, выводятся как регрессии (код выхода 1).
+
+Запуск:
+    python benchmarks/bench_suite.py --out baseline.json
+    python benchmarks/bench_suite.py --baseline baseline.json --threshold 0.15
+    python benchmarks/bench_suite.py --quick --only engine,sensors
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import dataclasses
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.config import SETTINGS, TeamConfig
+from src.core.engine import GameEngine
+from src.core.vec_engine import VecGameEngine
+from src.input.strategies import MultiAgentStrategy
+from src.ai.model import SnakeNet
+from src.ai.rl_trainer import RLTrainer
+from src.ai.ga_trainer import GATrainer
+
+GRIDS = (20, 50, 100, 200)
+SNAKES = (1, 10, 100)
+LENGTHS = (3, 30)
+GROUPS = ('engine', 'sensors', 'inference', 'training', 'rendering')
+
+def make_config(grid, snakes, length):
+    # Окно не больше ~800 px, чтобы отрисовка больших полей сравнивалась с малыми
+    return dataclasses.replace(
+        SETTINGS, grid_width=grid, grid_height=grid, block_size=max(2, 800 // grid),
+        initial_snake_length=length, stats_enabled=False,
+        teams=[TeamConfig("Bench", snakes, (0, 200, 0))],
+    )
+
+def layouts():
+    """(grid, snakes, length), в которых змейки помещаются на поле с запасом."""
+    for grid in GRIDS:
+        for snakes in SNAKES:
+            for length in LENGTHS:
+                if length * 2 < grid and snakes * length * 4 <= grid * grid:
+                    yield grid, snakes, length
+
+def timeit(fn, min_time, repeat=3):
+    """Время вызова fn в секундах: лучшее из repeat замеров по min_time / repeat, как в модуле timeit.
+
+    Минимум устойчивее среднего к фоновой нагрузке, поэтому сравнение с baseline меньше шумит.
+    """
+    fn()
+    best = float('inf')
+    for _ in range(repeat):
+        calls, elapsed, number = 0, 0.0, 1
+        while elapsed < min_time / repeat:
+            t0 = time.perf_counter()
+            for _ in range(number):
+                fn()
+            elapsed += time.perf_counter() - t0
+            calls += number
+            number *= 2
+        best = min(best, elapsed / calls)
+    return best
+
+def random_play(engine, strategy, steps, rng):
+    for _ in range(steps):
+        actions = rng.integers(0, 3, size=len(engine.snakes))
+        for snake, action in zip(engine.snakes, actions):
+            snake.set_direction(strategy._transform_action(snake, action))
+        engine.step(actions)
+
+# ! Группы: каждая возвращает [(имя, параметры, секунд на вызов, единиц работы на вызов)]
+
+def bench_engine(min_time, seed):
+    rows = []
+    for grid, snakes, length in layouts():
+        config = make_config(grid, snakes, length)
+        engine = GameEngine(config, seed)
+        strategy = MultiAgentStrategy(config, seed)
+        rng = np.random.default_rng(seed)
+
+        def step():
+            random_play(engine, strategy, 1, rng)
+
+        params = dict(grid=grid, snakes=snakes, length=length)
+        rows.append(('engine.step', params, timeit(step, min_time), snakes))
+
+        vec = VecGameEngine(make_config(grid, 1, length), num_envs=snakes, seed=seed)
+
+        def vec_step():
+            vec.step(rng.integers(0, 3, size=(snakes, 1)))
+
+        rows.append(('vec_engine.step', params, timeit(vec_step, min_time), snakes))
+    return rows
+
+def bench_sensors(min_time, seed):
+    rows = []
+    for grid, snakes, length in layouts():
+        config = make_config(grid, snakes, length)
+        engine = GameEngine(config, seed)
+        strategy = MultiAgentStrategy(config, seed)
+        random_play(engine, strategy, 20, np.random.default_rng(seed))
+        state = engine.get_state()
+
+        def per_snake():
+            for snake in engine.snakes:
+                strategy._get_sensors(snake, state)
+
+        params = dict(grid=grid, snakes=snakes, length=length)
+        rows.append(('sensors.batch', params, timeit(lambda: strategy.get_sensors_batch(state), min_time), snakes))
+        rows.append(('sensors.per_snake', params, timeit(per_snake, min_time), snakes))
+    return rows
+
+def bench_inference(min_time, seed):
+    rows = []
+    strategy = MultiAgentStrategy(SETTINGS, seed)
+    for snakes in SNAKES:
+        rng = np.random.default_rng(seed)
+        sensors = rng.integers(0, 2, size=(snakes, 11)).astype(np.float32)
+        model = SnakeNet(seed=seed)
+        numpy_model = model.export_numpy()
+        ga = GATrainer(SnakeNet, population_size=max(snakes, 2), seed=seed)
+        members = [ga.get_member(1, i) for i in range(snakes)]
+
+        cases = (
+            ('inference.torch', [model] * snakes),
+            ('inference.numpy', [numpy_model] * snakes),
+            ('inference.population', members),
+        )
+        for name, models in cases:
+            elapsed = timeit(lambda: strategy.get_actions_batch(models, sensors), min_time)
+            rows.append((name, dict(snakes=snakes), elapsed, snakes))
+    return rows
+
+def bench_training(min_time, seed):
+    rows = []
+    size = 10_000
+    for batch_size in (32, 256, 1024):
+        trainer = RLTrainer(SnakeNet(seed=seed), memory_size=size, seed=seed)
+        rng = np.random.default_rng(seed)
+        trainer.memory.push_batch(
+            rng.integers(0, 2, (size, 11)).astype(np.float32), rng.integers(0, 3, size),
+            rng.standard_normal(size).astype(np.float32), rng.integers(0, 2, (size, 11)).astype(np.float32),
+            (rng.random(size) < 0.05).astype(np.float32),
+        )
+        elapsed = timeit(lambda: trainer.train_batch(batch_size), min_time)
+        rows.append(('training.train_batch', dict(batch=batch_size), elapsed, batch_size))
+
+    trainer = RLTrainer(SnakeNet(seed=seed), seed=seed)
+    state = np.random.default_rng(seed).integers(0, 2, size=11).astype(np.float32)
+    elapsed = timeit(lambda: trainer.train_step(state, 1, 1.0, state, False), min_time)
+    rows.append(('training.train_step', dict(batch=1), elapsed, 1))
+    return rows
+
+def bench_rendering(min_time, seed):
+    try:
+        from src.ui.pygame_ui import PygameRenderer
+        from src.ui.viewer import make_snapshot, _restore_snapshot
+    except ImportError:
+        print("pygame is not installed: rendering skipped")
+        return []
+
+    rows = []
+    for grid, snakes, length in layouts():
+        config = make_config(grid, snakes, length)
+        engine = GameEngine(config, seed)
+        strategy = MultiAgentStrategy(config, seed)
+        rng = np.random.default_rng(seed)
+        ui = PygameRenderer(config)
+        # Кадры записаны заранее, чтобы в замер не попадал шаг движка
+        frames = []
+        for _ in range(64):
+            random_play(engine, strategy, 1, rng)
+            frames.append(_restore_snapshot(make_snapshot(engine.get_state())))
+        frame = iter(())
+
+        def next_frame():
+            nonlocal frame
+            state = next(frame, None)
+            if state is None:
+                frame = iter(frames)
+                state = next(frame)
+            return state
+
+        def incremental():
+            ui.render(next_frame())
+
+        def full():
+            ui._full_redraw = True
+            ui.render(next_frame())
+
+        params = dict(grid=grid, snakes=snakes, length=length)
+        rows.append(('rendering.incremental', params, timeit(incremental, min_time), 1))
+        rows.append(('rendering.full', params, timeit(full, min_time), 1))
+        ui.close()
+    return rows
+
+# ! Результаты и сравнение
+
+def case_key(case):
+    return case['name'] + '(' + ','.join(f"{k}={v}" for k, v in sorted(case['params'].items())) + ')'
+
+def run(groups, min_time, seed):
+    torch.set_num_threads(1)
+    cases = []
+    for group in groups:
+        for name, params, elapsed, units in globals()[f"bench_{group}"](min_time, seed):
+            case = {
+                'name': name, 'params': params,
+                'us_per_call': elapsed * 1e6,
+                'calls_per_sec': 1.0 / elapsed,
+                'units_per_sec': units / elapsed,
+            }
+            cases.append(case)
+            print(f"{case_key(case):<55}{case['us_per_call']:>12.1f} us{case['calls_per_sec']:>12.0f} /s")
+    return {
+        'meta': {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'torch': torch.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'seed': seed,
+            'min_time': min_time,
+        },
+        'cases': cases,
+    }
+
+def compare(results, baseline, threshold):
+    """Случаи, у которых время на вызов выросло больше чем на threshold относительно baseline."""
+    base = {case_key(c): c for c in baseline['cases']}
+    regressions = []
+    print(f"\n{'case':<55}{'baseline us':>13}{'now us':>10}{'change':>9}")
+    for case in results['cases']:
+        key = case_key(case)
+        if key not in base:
+            continue
+        before, now = base[key]['us_per_call'], case['us_per_call']
+        change = now / before - 1.0
+        mark = ' <- regression' if change > threshold else ''
+        print(f"{key:<55}{before:>13.1f}{now:>10.1f}{change:>+9.1%}{mark}")
+        if change > threshold:
+            regressions.append((key, change))
+    return regressions
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Snake AI benchmark suite")
+    parser.add_argument("--only", type=str, default=",".join(GROUPS), help=f"comma-separated groups: {','.join(GROUPS)}")
+    parser.add_argument("--quick", action="store_true", help="shorter timing windows")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=str, default="bench_results.json", help="where to write JSON results")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="slowdown that counts as a regression")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    groups = [g for g in args.only.split(",") if g]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        sys.exit(f"Unknown groups: {', '.join(sorted(unknown))}")
+
+    results = run(groups, 0.1 if args.quick else 0.5, args.seed)
+    with open(args.out, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved: {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+        print("No regressions.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Бенчмарк шага обучения RLTrainer: аллокации и время на минибатч в установившемся режиме.
+
+Сравнивается train_batch с прежним вариантом (get с копиями, autograd, clone target).
+Память считается двумя способами: tracemalloc (Python и массивы NumPy) и профайлер torch
+(сумма выделений тензоров на CPU).
+
+Запуск: python benchmarks/bench_train.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import torch
+from torch.profiler import profile, ProfilerActivity
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.ai.model import SnakeNet
+from src.ai.rl_trainer import RLTrainer
+
+def reference_step(trainer, batch_size):
+    """Прежний train_batch: новые массивы и тензоры на каждый вызов, два forward."""
+    idx = trainer.memory.sample_indices(batch_size)
+    states, actions, rewards, next_states, dones = (torch.from_numpy(a) for a in trainer.memory.get(idx))
+    pred = trainer.model(states)
+    with torch.no_grad():
+        next_q = trainer.model(next_states).max(dim=1).values
+        target = pred.detach().clone()
+        target[torch.arange(len(actions)), actions] = rewards + trainer.gamma * next_q * (1 - dones)
+    trainer.optimizer.zero_grad()
+    loss = trainer.criterion(pred, target)
+    loss.backward()
+    trainer.optimizer.step()
+    return loss.item()
+
+def make_trainer(size=10_000, seed=0):
+    trainer = RLTrainer(SnakeNet(seed=seed), memory_size=size, seed=seed)
+    rng = np.random.default_rng(seed)
+    trainer.memory.push_batch(
+        rng.integers(0, 2, (size, 11)).astype(np.float32), rng.integers(0, 3, size),
+        rng.standard_normal(size).astype(np.float32), rng.integers(0, 2, (size, 11)).astype(np.float32),
+        (rng.random(size) < 0.05).astype(np.float32),
+    )
+    return trainer
+
+def measure(step, steps):
+    for _ in range(10):
+        step()
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    for _ in range(steps):
+        step()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        for _ in range(steps):
+            step()
+    torch_bytes = sum(max(e.self_cpu_memory_usage, 0) for e in prof.key_averages())
+
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        step()
+    elapsed = (time.perf_counter() - t0) / steps
+    return (peak - base) / 1024, (current - base) / steps, torch_bytes / steps / 1024, elapsed * 1e3
+
+def main(steps=200):
+    torch.set_num_threads(1)
+    print(f"{'batch':>6}{'path':>12}{'py peak KB':>12}{'py net B/step':>15}{'torch KB/step':>15}{'ms/step':>9}")
+    for batch_size in (32, 256, 1024):
+        old = make_trainer()
+        new = make_trainer()
+        rows = (
+            ('reference', lambda: reference_step(old, batch_size)),
+            ('train_batch', lambda: new.train_batch(batch_size)),
+        )
+        for name, step in rows:
+            peak_kb, net_b, torch_kb, ms = measure(step, steps)
+            print(f"{batch_size:>6}{name:>12}{peak_kb:>12.1f}{net_b:>15.1f}{torch_kb:>15.1f}{ms:>9.3f}")
+
+if __name__ == "__main__":
+    main()
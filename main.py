@@ -1,88 +1,320 @@
-import random
 import os
-from src import *
+import time
+import argparse
+import numpy as np
+from src import SETTINGS, GameEngine, MultiAgentStrategy, RLTrainer, GATrainer, SnakeNet, ParallelEvaluator
+from src import ActorLearner, SharedReplayBuffer, TrajectoryWriter, TrajectoryDataset, OfflineTrainer, open_trajectory
+from src.core.profiler import ProfileWindow
+
+def _bounded(cast, minimum):
+    """Тип для argparse: число не меньше minimum."""
+    def parse(text):
+        value = cast(text)
+        if value < minimum:
+            raise argparse.ArgumentTypeError(f"must be >= {minimum}, got {text}")
+        return value
+    parse.__name__ = cast.__name__
+    return parse
+
+def _iteration_window(text):
+    """Тип для argparse: START:END, 0 <= START < END."""
+    try:
+        start, end = (int(v) for v in text.split(":"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected START:END, got {text}")
+    if not 0 <= start < end:
+        raise argparse.ArgumentTypeError(f"expected 0 <= START < END, got {text}")
+    return start, end
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Multi-Brain Snake AI")
+    parser.add_argument("--headless", action="store_true", help="train without pygame and display")
+    parser.add_argument("--iterations", type=_bounded(int, 0), default=0, help="stop after N iterations (0 - never)")
+    parser.add_argument("--render-every", type=_bounded(int, 1), default=SETTINGS.render_every, help="render every N steps")
+    parser.add_argument("--render-hz", type=_bounded(float, 0.0), default=SETTINGS.render_max_hz, help="render at most X times per second (0 - no limit)")
+    parser.add_argument("--inline-render", action="store_true", help="draw in the training process instead of a viewer process")
+    parser.add_argument("--ga-parallel", action="store_true", help="evolve GA teams with headless episodes in a process pool")
+    parser.add_argument("--generations", type=_bounded(int, 1), default=100, help="generations for --ga-parallel")
+    parser.add_argument("--workers", type=_bounded(int, 0), default=0, help="worker processes for --ga-parallel (0 - all cores)")
+    parser.add_argument("--episodes", type=_bounded(int, 1), default=3, help="episodes per genome for --ga-parallel")
+    parser.add_argument("--distributed", action="store_true", help="train an RL team with actor processes and a learner")
+    parser.add_argument("--actors", type=_bounded(int, 0), default=0, help="actor processes for --distributed (0 - cores - 1)")
+    parser.add_argument("--train-steps", type=_bounded(int, 1), default=100_000, help="learner minibatch steps for --distributed")
+    parser.add_argument("--team", type=str, default=None, help="team to train: with --distributed defaults to the first RL team, "
+                             "with --offline to one model per recorded team")
+    parser.add_argument("--seed", type=_bounded(int, 0), default=SETTINGS.seed, help="seed for all generators of the run (default - random)")
+    parser.add_argument("--record", type=str, default=None, metavar="PATH",
+                        help="record every transition to a memory-mappable .npy trajectory file")
+    parser.add_argument("--offline", type=str, nargs="+", default=None, metavar="PATH",
+                        help="train an RL model on recorded trajectory files instead of playing")
+    parser.add_argument("--epochs", type=_bounded(int, 1), default=10, help="passes over the data for --offline")
+    parser.add_argument("--profile", type=_iteration_window, default=None, metavar="START:END",
+                        help="dump cProfile and tracemalloc for iterations START..END into ./profiles")
+    parser.add_argument("--weights-dtype", choices=("float32", "float16", "int8"), default=SETTINGS.weights_dtype,
+                        help="weight format shared with GA workers and actors")
+    return parser.parse_args()
+
+def root_seed(args):
+    """Корень дерева seed-ов запуска; печатаем энтропию, чтобы запуск можно было повторить через --seed."""
+    root = np.random.SeedSequence(args.seed)
+    print(f"Seed: {root.entropy}")
+    return root
+
+def seed_int(seed_seq):
+    return int(seed_seq.generate_state(1)[0])
+
+def run_distributed(args):
+    rl_teams = [t for t in SETTINGS.teams if t.brain_type == "RL" and (args.team is None or t.name == args.team)]
+    if not rl_teams:
+        print("No matching RL team in config.")
+        return
+
+    team = rl_teams[0]
+    model_seed, buffer_seed, actors_seed = root_seed(args).spawn(3)
+    model = SnakeNet(seed=seed_int(model_seed))
+    buffer = SharedReplayBuffer(SETTINGS.memory_size, model.linear1.in_features, seed=buffer_seed)
+    trainer = RLTrainer(model, memory=buffer)
+    print(f"--- Actor-learner: {team.name} ---")
+    try:
+        ActorLearner(SETTINGS, team, trainer, num_actors=args.actors or None, seed=seed_int(actors_seed),
+                     weights_dtype=args.weights_dtype).run(args.train_steps, SETTINGS.batch_size)
+    except KeyboardInterrupt:
+        print("--- Stopped ---")
+    finally:
+        buffer.close()
+    model.save(f"rl_{team.name.replace(' ', '_').lower()}.pth")
+
+def recorded_reward_modes(paths):
+    """Команда -> множество reward_mode, с которыми она записана (None - запись без этих метаданных)."""
+    modes = {}
+    for path in paths:
+        _, meta = open_trajectory(path)
+        for name, mode in zip(meta['teams'], meta.get('reward_modes', [None] * len(meta['teams']))):
+            modes.setdefault(name, set()).add(mode)
+    return modes
+
+def run_offline(args):
+    # Своя Q-сеть на каждую команду: награды linear и dynamic в разных масштабах, общие Q-цели не сходятся
+    modes = recorded_reward_modes(args.offline)
+    teams = list(modes) if args.team is None else [args.team]
+    for team, team_seed in zip(teams, root_seed(args).spawn(len(teams))):
+        if len(modes.get(team, ())) > 1:
+            print(f"Skipping {team}: recorded with different reward modes {sorted(m or 'unknown' for m in modes[team])}")
+            continue
+        dataset = TrajectoryDataset(args.offline, teams=[team])
+        if len(dataset) < SETTINGS.batch_size:
+            print(f"Skipping {team}: not enough transitions ({len(dataset)})")
+            continue
+
+        model_seed, shuffle_seed = team_seed.spawn(2)
+        trainer = RLTrainer(SnakeNet(seed=seed_int(model_seed)), memory_size=1)
+        print(f"--- Offline: {team}, {len(dataset)} transitions from {len(args.offline)} file(s) ---")
+        stopped = False
+        try:
+            OfflineTrainer(trainer, dataset, SETTINGS.batch_size, seed=shuffle_seed).fit(args.epochs)
+        except KeyboardInterrupt:
+            print("--- Stopped ---")
+            stopped = True
+        trainer.model.save(f"offline_{team.replace(' ', '_').lower()}.pth")
+        if stopped:
+            return
+
+def run_parallel_ga(args):
+    ga_teams = [t for t in SETTINGS.teams if t.brain_type == "GA"]
+    if not ga_teams:
+        print("No GA teams in config.")
+        return
+
+    team_seeds = root_seed(args).spawn(len(ga_teams))
+    for team, team_seed in zip(ga_teams, team_seeds):
+        trainer_seed, episodes_seed = team_seed.spawn(2)
+        trainer = GATrainer(SnakeNet, SETTINGS.ga_population_size, SETTINGS.ga_elite, seed=trainer_seed)
+        print(f"--- Parallel GA: {team.name} ---")
+        with ParallelEvaluator(SETTINGS, team, trainer.population_size, trainer.genome_size, trainer.layout,
+                               workers=args.workers or None, episodes=args.episodes, seed=seed_int(episodes_seed),
+                               weights_dtype=args.weights_dtype) as evaluator:
+            for _ in range(args.generations):
+                start = time.perf_counter()
+                generation = trainer.generation
+                fitness = trainer.evaluate_generation(evaluator)
+                elapsed = time.perf_counter() - start
+                print(f"[{team.name}] Gen {generation}: best={fitness.max():.0f} mean={fitness.mean():.0f} "
+                      f"record={trainer.best_fitness:.0f} ({len(fitness) / elapsed:.1f} genomes/s)")
+        trainer.best_model().save(f"ga_{team.name.replace(' ', '_').lower()}.pth")
 
 def main():
-    ui = PygameRenderer(SETTINGS)
-    engine = GameEngine(SETTINGS)
-    strategy = MultiAgentStrategy(SETTINGS)
-    
-    models_pool = {t.name: [] for t in SETTINGS.teams}
+    args = parse_args()
+    if args.ga_parallel:
+        run_parallel_ga(args)
+        return
+    if args.distributed:
+        run_distributed(args)
+        return
+    if args.offline:
+        run_offline(args)
+        return
+
+    ui = None
+    if not args.headless:
+        if SETTINGS.viewer_process and not args.inline_render:
+            from src.ui import ViewerProcess
+            ui = ViewerProcess(SETTINGS)
+        else:
+            from src.ui import PygameRenderer
+            ui = PygameRenderer(SETTINGS)
+    root = root_seed(args)
+    engine_seed, strategy_seed, *team_seeds = root.spawn(2 + len(SETTINGS.teams))
+    engine = GameEngine(SETTINGS, engine_seed)
+    strategy = MultiAgentStrategy(SETTINGS, strategy_seed)
+    timer = engine.timer
+    profile_window = None
+    if args.profile:
+        profile_window = ProfileWindow(*args.profile)
+
+    team_names = [t.name for t in SETTINGS.teams]
+    recorder = None
+    if args.record:
+        recorder = TrajectoryWriter(args.record, team_names, meta={
+            'seed': root.entropy, 'grid': [SETTINGS.grid_width, SETTINGS.grid_height],
+            'brains': [t.brain_type for t in SETTINGS.teams],
+            'reward_modes': [t.reward_mode for t in SETTINGS.teams],
+        })
+        snake_teams = np.array([team_names.index(s.team_name) for s in engine.snakes], dtype=np.uint8)
+
     rl_trainers = {}
+    rl_actors = {}
     ga_trainers = {}
     last_known_records = {t.name: 0 for t in SETTINGS.teams}
-    
-    for team in SETTINGS.teams:
+
+    for team, team_seed in zip(SETTINGS.teams, team_seeds):
         if team.brain_type == "RL":
-            m = SnakeNet()
-            models_pool[team.name] = [m for _ in range(team.count)]
-            rl_trainers[team.name] = RLTrainer(m)
+            model_seed, buffer_seed = team_seed.spawn(2)
+            rl_trainers[team.name] = RLTrainer(SnakeNet(seed=seed_int(model_seed)), memory_size=SETTINGS.memory_size,
+                                               prioritized=SETTINGS.prioritized_replay, seed=buffer_seed)
+            # Действия считаем по NumPy-копии весов, она обновляется после шагов обучения
+            rl_actors[team.name] = rl_trainers[team.name].model.export_numpy()
         else:
-            ga_trainers[team.name] = GATrainer(SnakeNet)
-            models_pool[team.name] = [SnakeNet() for _ in range(team.count)]
+            ga_trainers[team.name] = GATrainer(SnakeNet, SETTINGS.ga_population_size, SETTINGS.ga_elite, seed=team_seed)
+
+    # Модель каждой змейки: общая NumPy-копия модели команды для RL, особь популяции для GA
+    snake_models = []
+    ga_individuals = {}
+    rl_rows = {name: [] for name in rl_trainers}
+    for i, snake in enumerate(engine.snakes):
+        if snake.brain_type == "RL":
+            rl_rows[snake.team_name].append(i)
+            snake_models.append(rl_actors[snake.team_name])
+        else:
+            ga_individuals[i] = ga_trainers[snake.team_name].next_individual()
+            snake_models.append(ga_trainers[snake.team_name].get_member(*ga_individuals[i]))
 
     epsilon = 80
     current_fps = SETTINGS.fps_train
-    
+    # Признаки после шага совпадают с признаками перед следующим шагом
+    sensors_batch = None
+    last_render = 0.0
+    min_render_interval = 1.0 / args.render_hz if args.render_hz > 0 else 0.0
+
     print("--- Proccessing ---")
-    print("Controls: SPACE (speed), G (graphs), S/L (save/load)")
-
-    while True:
-        inputs = ui.get_input()
-        if inputs['quit']: break
-        if inputs['toggle_speed']:
-            current_fps = SETTINGS.fps_watch if current_fps == SETTINGS.fps_train else SETTINGS.fps_train
-        
-        if inputs.get('toggle_graph', False):
-            csv_path = engine.analytics.get_current_filename()
-            if os.path.exists(csv_path):
-                print(f"Opening stats: {csv_path}")
-                SnakePlotter(csv_path)
-            else:
-                print("Stats file not created yet (wait for first interval).")
-
-        state_dto = engine.get_state()
-        indices = []
-        old_states = []
-        
-        for i, snake in enumerate(engine.snakes):
-            model = models_pool[snake.team_name][i % len(models_pool[snake.team_name])]
-            sensors = strategy._get_sensors(snake, state_dto)
-            old_states.append(sensors)
-            
-            if snake.brain_type == "RL" and random.randint(0, 100) < epsilon:
-                action_idx = random.randint(0, 2)
-            else:
-                _, action_idx, _ = strategy.get_action(model, snake, state_dto)
-            
-            indices.append(action_idx)
-            snake.set_direction(strategy._transform_action(snake, action_idx))
-
-        results, _ = engine.step(indices) 
-        new_state_dto = engine.get_state()
-        
-        for i, snake in enumerate(engine.snakes):
-            reward, done, score = results[i]
-            
-            if engine.team_stats[snake.team_name].record > last_known_records[snake.team_name]:
-                last_known_records[snake.team_name] = engine.team_stats[snake.team_name].record
-                print(f"RECORD! [{snake.team_name}] Score: {last_known_records[snake.team_name]} (Brain: {snake.brain_type})")
-
-            if snake.brain_type == "RL":
-                trainer = rl_trainers[snake.team_name]
-                new_sensors = strategy._get_sensors(snake, new_state_dto)
-                trainer.train_step(old_states[i], indices[i], reward, new_sensors, done)
-                if done and epsilon > 5: epsilon -= 0.05
-            else:
-                if done:
-                    fitness = (snake.score * 500) + snake.steps_alive                    
-                    ga_manager = ga_trainers[snake.team_name]
-                    ga_manager.save_candidate(models_pool[snake.team_name][i % len(SETTINGS.teams)], fitness)
-                    models_pool[snake.team_name][i % len(SETTINGS.teams)] = ga_manager.get_offspring()
-                    engine.team_stats[snake.team_name].generation += 1
-
-        ui.render(new_state_dto)
-        if current_fps > 0: ui.clock.tick(current_fps)
+    if ui is None:
+        print("Headless mode: Ctrl+C to stop")
+    else:
+        print("Controls: SPACE (speed), G (graphs), S/L (save/load)")
+
+    try:
+        while args.iterations <= 0 or engine.iteration < args.iterations:
+            if profile_window is not None:
+                profile_window.update(engine.iteration)
+            timer.mark()
+            if ui is not None:
+                inputs = ui.get_input()
+                if inputs['quit']: break
+                if inputs['toggle_speed']:
+                    current_fps = SETTINGS.fps_watch if current_fps == SETTINGS.fps_train else SETTINGS.fps_train
+
+                if inputs.get('toggle_graph', False):
+                    csv_path = engine.analytics.get_current_filename()
+                    if csv_path and os.path.exists(csv_path):
+                        from src.ui import open_plotter
+                        print(f"Opening stats: {csv_path}")
+                        open_plotter(csv_path)
+                    else:
+                        print("Stats file not created yet (wait for first interval).")
+
+            timer.lap('render')
+
+            state_dto = engine.get_state()
+            if sensors_batch is None:
+                sensors_batch = strategy.get_sensors_batch(state_dto)
+            old_states = sensors_batch
+            timer.lap('sense')
+
+            epsilons = [epsilon / 100 if s.brain_type == "RL" else 0.0 for s in engine.snakes]
+            indices = strategy.get_actions_batch(snake_models, old_states, epsilons)
+
+            for snake, action_idx in zip(engine.snakes, indices):
+                snake.set_direction(strategy._transform_action(snake, action_idx))
+            timer.lap('act')
+
+            results, _ = engine.step(indices)
+            timer.lap('step')
+            new_state_dto = engine.get_state()
+            sensors_batch = strategy.get_sensors_batch(new_state_dto)
+            timer.lap('sense')
+
+            rewards = np.array([r for r, _, _ in results], dtype=np.float32)
+            dones = np.array([d for _, d, _ in results], dtype=np.float32)
+            # Переходы команды за тик - одной записью в её буфер
+            for name, rows in rl_rows.items():
+                rl_trainers[name].remember_batch(old_states[rows], indices[rows], rewards[rows], sensors_batch[rows], dones[rows])
+            if recorder is not None:
+                recorder.append(engine.iteration, old_states, indices, rewards, sensors_batch, dones,
+                                engine.death_reasons, snake_teams)
+
+            for i, snake in enumerate(engine.snakes):
+                reward, done, score = results[i]
+
+                if engine.team_stats[snake.team_name].record > last_known_records[snake.team_name]:
+                    last_known_records[snake.team_name] = engine.team_stats[snake.team_name].record
+                    print(f"RECORD! [{snake.team_name}] Score: {last_known_records[snake.team_name]} (Brain: {snake.brain_type})")
+
+                if snake.brain_type == "RL":
+                    if done and epsilon > 5: epsilon -= 0.05
+                else:
+                    if done:
+                        fitness = (snake.last_score * 500) + snake.last_steps_alive
+                        ga_manager = ga_trainers[snake.team_name]
+                        ga_manager.report(*ga_individuals[i], fitness)
+                        ga_individuals[i] = ga_manager.next_individual()
+                        snake_models[i] = ga_manager.get_member(*ga_individuals[i])
+                        engine.team_stats[snake.team_name].generation = ga_manager.generation
+
+            if engine.iteration % SETTINGS.train_every == 0:
+                for name, trainer in rl_trainers.items():
+                    trainer.train_batch(SETTINGS.batch_size)
+                    rl_actors[name].refresh(trainer.model)
+            timer.lap('learn')
+
+            if ui is not None:
+                # В режиме просмотра рисуем каждый шаг, при обучении - с прореживанием
+                watching = current_fps > 0 and current_fps == SETTINGS.fps_watch
+                now = time.perf_counter()
+                if watching or (engine.iteration % args.render_every == 0 and now - last_render >= min_render_interval):
+                    ui.render(new_state_dto)
+                    last_render = now
+                timer.lap('render')
+                if current_fps > 0: ui.tick(current_fps)
+            timer.end_tick()
+    except KeyboardInterrupt:
+        print("--- Stopped ---")
+    finally:
+        if recorder is not None:
+            recorder.close()
+            print(f"--- Trajectory saved: {args.record} ({recorder.count} transitions) ---")
+        if profile_window is not None:
+            profile_window.close()
+        if ui is not None:
+            ui.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,22 +1,49 @@
 from .config import SETTINGS, GameConfig
 from .core import *
-from .ui import *
-from .ai import *
+from . import ai
+# Без классов на torch: их отдает __getattr__ ниже
+from .ai import (
+    NumpySnakeNet, ParallelEvaluator, ActorLearner, SharedReplayBuffer,
+    ReplayBuffer, PrioritizedReplayBuffer, TrajectoryDataset, OfflineTrainer,
+)
 from .input import *
-from .plotter import SnakePlotter
 
 __all__ = [
     "SETTINGS",
     "GameConfig",
     "GameEngine",
+    "VecGameEngine",
     "Snake",
     "Point",
     "Direction",
     "GameStateDTO",
+    "TrajectoryWriter",
+    "open_trajectory",
     "PygameRenderer",
     "RLTrainer",
     "GATrainer",
+    "PopulationMember",
+    "ParallelEvaluator",
+    "ActorLearner",
+    "SharedReplayBuffer",
+    "TrajectoryDataset",
+    "OfflineTrainer",
+    "ReplayBuffer",
+    "PrioritizedReplayBuffer",
     "SnakeNet",
+    "NumpySnakeNet",
     "MultiAgentStrategy",
     "SnakePlotter"
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    # pygame, matplotlib и torch грузим только по требованию, чтобы headless-режим и воркеры их не импортировали
+    if name in ai.TORCH_EXPORTS:
+        return getattr(ai, name)
+    if name == "PygameRenderer":
+        from .ui import PygameRenderer
+        return PygameRenderer
+    if name == "SnakePlotter":
+        from .plotter import SnakePlotter
+        return SnakePlotter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
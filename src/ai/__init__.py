@@ -1,9 +1,34 @@
-from .model import SnakeNet
-from .rl_trainer import RLTrainer
-from .ga_trainer import GATrainer
+from .numpy_net import NumpySnakeNet
+from .ga_eval import ParallelEvaluator
+from .distributed import ActorLearner, SharedReplayBuffer
+from .replay import ReplayBuffer, PrioritizedReplayBuffer
+from .offline import TrajectoryDataset, OfflineTrainer
 
 __all__ = [
     "SnakeNet",
+    "NumpySnakeNet",
     "RLTrainer",
-    "GATrainer"
-]
\ No newline at end of file
+    "GATrainer",
+    "PopulationMember",
+    "ParallelEvaluator",
+    "ActorLearner",
+    "SharedReplayBuffer",
+    "ReplayBuffer",
+    "PrioritizedReplayBuffer",
+    "TrajectoryDataset",
+    "OfflineTrainer"
+]
+
+# Классы на torch грузим только по требованию: воркерам GA и акторам для вывода хватает NumPy
+TORCH_EXPORTS = {
+    "SnakeNet": ".model",
+    "RLTrainer": ".rl_trainer",
+    "GATrainer": ".ga_trainer",
+    "PopulationMember": ".ga_trainer",
+}
+
+def __getattr__(name):
+    if name in TORCH_EXPORTS:
+        from importlib import import_module
+        return getattr(import_module(TORCH_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
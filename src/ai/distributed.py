@@ -0,0 +1,261 @@
+import time
+import dataclasses
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from src.ai.replay import ReplayBuffer
+from src.ai.numpy_net import NumpySnakeNet
+from src.ai.quantize import WEIGHT_DTYPES, quantize
+
+class SharedReplayBuffer(ReplayBuffer):
+    """ReplayBuffer с теми же массивами, но в общей памяти: пишут акторы, читает learner."""
+
+    FIELDS = (
+        ('states', np.float32, True),
+        ('actions', np.int64, False),
+        ('rewards', np.float32, False),
+        ('next_states', np.float32, True),
+        ('dones', np.float32, False),
+    )
+
+    def __init__(self, capacity=100_000, state_size=11, seed=None):
+        self.capacity = capacity
+        self.state_size = state_size
+        self.rng = np.random.default_rng(seed)
+        self._owner = True
+        self._shm = {}
+        for name, dtype, wide in self.FIELDS:
+            nbytes = capacity * (state_size if wide else 1) * np.dtype(dtype).itemsize
+            self._shm[name] = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._counters = mp.Array('q', 2)  # pos, size
+        self._lock = mp.Lock()
+        self._attach()
+
+    def _attach(self):
+        for name, dtype, wide in self.FIELDS:
+            shape = (self.capacity, self.state_size) if wide else (self.capacity,)
+            setattr(self, name, np.ndarray(shape, dtype=dtype, buffer=self._shm[name].buf))
+
+    def __getstate__(self):
+        return {
+            'capacity': self.capacity, 'state_size': self.state_size,
+            'names': {k: shm.name for k, shm in self._shm.items()},
+            'counters': self._counters, 'lock': self._lock,
+        }
+
+    def __setstate__(self, state):
+        self.capacity = state['capacity']
+        self.state_size = state['state_size']
+        # Акторы только пишут в буфер, выборка - у learner
+        self.rng = np.random.default_rng()
+        self._owner = False
+        self._shm = {k: shared_memory.SharedMemory(name=n) for k, n in state['names'].items()}
+        self._counters = state['counters']
+        self._lock = state['lock']
+        self._attach()
+
+    @property
+    def pos(self):
+        return self._counters[0]
+
+    @pos.setter
+    def pos(self, value):
+        self._counters[0] = value
+
+    @property
+    def size(self):
+        return self._counters[1]
+
+    @size.setter
+    def size(self, value):
+        self._counters[1] = value
+
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        with self._lock:
+            return super().push_batch(states, actions, rewards, next_states, dones)
+
+    def get(self, idx):
+        # Копия под блокировкой, чтобы не читать строки, которые акторы как раз перезаписывают
+        with self._lock:
+            return super().get(idx)
+
+    def gather(self, idx, states, actions, rewards, next_states, dones):
+        with self._lock:
+            super().gather(idx, states, actions, rewards, next_states, dones)
+
+    def close(self):
+        for shm in self._shm.values():
+            shm.close()
+            if self._owner:
+                shm.unlink()
+
+
+class SharedWeights:
+    """Плоский вектор весов SnakeNet в общей памяти с номером версии.
+
+    dtype ('float32', 'float16', 'int8') - формат снимка; масштабы тензоров лежат в том же блоке.
+    """
+
+    def __init__(self, size, layout, dtype='float32'):
+        self.size = size
+        self.layout = layout
+        self.dtype = dtype
+        self._owner = True
+        self._shm = shared_memory.SharedMemory(create=True, size=self._nbytes())
+        self._version = mp.Value('q', 0)
+        self._attach()
+
+    def _nbytes(self):
+        return len(self.layout) * 4 + self.size * np.dtype(WEIGHT_DTYPES[self.dtype]).itemsize
+
+    def _attach(self):
+        n_scales = len(self.layout)
+        self.scales = np.ndarray(n_scales, dtype=np.float32, buffer=self._shm.buf)
+        self.flat = np.ndarray(self.size, dtype=WEIGHT_DTYPES[self.dtype], buffer=self._shm.buf, offset=n_scales * 4)
+
+    def __getstate__(self):
+        return {'size': self.size, 'layout': self.layout, 'dtype': self.dtype,
+                'name': self._shm.name, 'version': self._version}
+
+    def __setstate__(self, state):
+        self.size = state['size']
+        self.layout = state['layout']
+        self.dtype = state['dtype']
+        self._owner = False
+        self._shm = shared_memory.SharedMemory(name=state['name'])
+        self._version = state['version']
+        self._attach()
+
+    @property
+    def version(self):
+        return self._version.value
+
+    def publish(self, model):
+        from src.ai.ga_trainer import flatten_params
+        with self._version.get_lock():
+            quantize(flatten_params(model), self.layout, out=self.flat, scales=self.scales)
+            self._version.value += 1
+
+    def pull_numpy(self, net, known_version=-1):
+        """Копирует веса в массивы NumpySnakeNet, если они новее known_version; возвращает актуальную версию."""
+        with self._version.get_lock():
+            version = self._version.value
+            if version != known_version:
+                net.refresh_quantized(self.flat, self.scales, self.layout)
+        return version
+
+    def close(self):
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def actor_epsilons(num_actors, base=0.4, alpha=7.0):
+    # Как в Ape-X: у каждого актора свой уровень исследования, от base до почти нуля
+    if num_actors == 1:
+        return [base]
+    return [base ** (1 + alpha * i / (num_actors - 1)) for i in range(num_actors)]
+
+def _run_actor(actor_id, config, buffer, weights, epsilon, stop, stats, seed, sync_every):
+    from src.core.engine import GameEngine
+    from src.input.strategies import MultiAgentStrategy
+
+    engine_seed, strategy_seed = seed.spawn(2)
+    engine = GameEngine(config, engine_seed)
+    strategy = MultiAgentStrategy(config, strategy_seed)
+    # Акторам нужен только вывод: веса из общей памяти сразу в NumPy, без torch
+    model = NumpySnakeNet.from_flat(np.zeros(weights.size, dtype=np.float32), weights.layout)
+    version = weights.pull_numpy(model)
+    models = [model] * len(engine.snakes)
+    epsilons = [epsilon] * len(engine.snakes)
+
+    sensors = strategy.get_sensors_batch(engine.get_state())
+    while not stop.is_set():
+        if engine.iteration % sync_every == 0:
+            version = weights.pull_numpy(model, version)
+
+        actions = strategy.get_actions_batch(models, sensors, epsilons)
+        for snake, action_idx in zip(engine.snakes, actions):
+            snake.set_direction(strategy._transform_action(snake, action_idx))
+        results, _ = engine.step(actions)
+        next_sensors = strategy.get_sensors_batch(engine.get_state())
+
+        rewards = np.array([r for r, _, _ in results], dtype=np.float32)
+        dones = np.array([d for _, d, _ in results], dtype=np.float32)
+        buffer.push_batch(sensors, actions, rewards, next_sensors, dones)
+        sensors = next_sensors
+
+        # steps, episodes, сумма очков за эпизоды
+        base = actor_id * 3
+        stats[base] += len(results)
+        for snake, (_, done, _) in zip(engine.snakes, results):
+            if done:
+                stats[base + 1] += 1
+                stats[base + 2] += snake.last_score
+
+
+class ActorLearner:
+    """Несколько процессов-акторов со своими GameEngine пишут переходы в общий буфер,
+    learner в текущем процессе обучает SnakeNet и периодически публикует веса акторам."""
+
+    def __init__(self, config, team_config, trainer, num_actors=None, sync_every=100, seed=None,
+                 weights_dtype='float32'):
+        # Learner работает с torch-моделью; акторы этот модуль импортируют без torch
+        from src.ai.ga_trainer import flatten_params, param_layout
+        self.trainer = trainer
+        self.num_actors = num_actors or max(1, (mp.cpu_count() or 2) - 1)
+        self.epsilons = actor_epsilons(self.num_actors)
+        actor_config = dataclasses.replace(config, teams=[team_config], stats_enabled=False, profile_phases=False)
+
+        self.buffer = trainer.memory
+        self.weights = SharedWeights(len(flatten_params(trainer.model)), param_layout(trainer.model), weights_dtype)
+        self.weights.publish(trainer.model)
+        self.stop = mp.Event()
+        self.stats = mp.Array('d', self.num_actors * 3, lock=False)
+        # Независимые потоки случайных чисел для акторов
+        actor_seeds = np.random.SeedSequence(seed).spawn(self.num_actors)
+        self.actors = [
+            mp.Process(target=_run_actor, daemon=True, args=(
+                i, actor_config, self.buffer, self.weights, self.epsilons[i],
+                self.stop, self.stats, actor_seeds[i], sync_every))
+            for i in range(self.num_actors)
+        ]
+
+    def run(self, train_steps, batch_size=256, publish_every=50, log_every=1000):
+        for actor in self.actors:
+            actor.start()
+        start = time.perf_counter()
+        try:
+            while len(self.buffer) < batch_size:
+                self._check_actors()
+                time.sleep(0.01)
+            for step in range(1, train_steps + 1):
+                loss = self.trainer.train_batch(batch_size)
+                if step % publish_every == 0:
+                    self._check_actors()
+                    self.weights.publish(self.trainer.model)
+                if step % log_every == 0:
+                    self._log(step, loss, time.perf_counter() - start)
+        finally:
+            self.close()
+
+    def _check_actors(self):
+        # Акторы работают до stop, поэтому любой завершившийся процесс - это сбой
+        for i, actor in enumerate(self.actors):
+            if not actor.is_alive():
+                raise RuntimeError(f"Actor {i} exited with code {actor.exitcode}")
+
+    def _log(self, step, loss, elapsed):
+        stats = np.frombuffer(self.stats, dtype=np.float64).reshape(-1, 3)
+        episodes = stats[:, 1].sum()
+        mean_score = stats[:, 2].sum() / episodes if episodes else 0.0
+        print(f"[LEARNER] step {step}: loss={loss:.4f}, transitions={int(stats[:, 0].sum())} "
+              f"({stats[:, 0].sum() / elapsed:.0f}/s), episodes={int(episodes)}, mean score={mean_score:.2f}")
+
+    def close(self):
+        self.stop.set()
+        for actor in self.actors:
+            actor.join(timeout=5)
+            if actor.is_alive():
+                actor.terminate()
+        self.weights.close()
@@ -0,0 +1,115 @@
+import os
+import dataclasses
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from src.ai.numpy_net import NumpySnakeNet
+from src.ai.quantize import WEIGHT_DTYPES, quantize, dequantize
+
+# Состояние процесса-воркера: подключенная общая память и конфиг эпизодов
+_worker = {}
+
+def ga_fitness(score, steps_alive):
+    return (score * 500) + steps_alive
+
+def episode_config(config, team_config):
+    """Конфиг headless-эпизода: одна змейка команды, без CSV-статистики."""
+    team = dataclasses.replace(team_config, count=1)
+    return dataclasses.replace(config, teams=[team], stats_enabled=False, profile_phases=False)
+
+def run_episode(config, genome, layout, seed, max_steps):
+    """Один headless-эпизод GameEngine до первой смерти; возвращает фитнес. seed - int или SeedSequence."""
+    from src.core.engine import GameEngine
+    from src.input.strategies import MultiAgentStrategy
+
+    engine = GameEngine(config, seed)
+    strategy = MultiAgentStrategy(config)
+    net = NumpySnakeNet.from_flat(genome, layout)
+    snake = engine.snakes[0]
+    for _ in range(max_steps):
+        sensors = strategy.get_sensors_batch(engine.get_state())
+        action = int(net.act(sensors[0]))
+        snake.set_direction(strategy._transform_action(snake, action))
+        results, _ = engine.step([action])
+        if results[0][1]:
+            return ga_fitness(snake.last_score, snake.last_steps_alive)
+    return ga_fitness(snake.score, snake.steps_alive)
+
+def _init_worker(genome_name, scales_name, fitness_name, shape, dtype, config, layout, episodes, max_steps, seed):
+    genomes_shm = shared_memory.SharedMemory(name=genome_name)
+    scales_shm = shared_memory.SharedMemory(name=scales_name)
+    fitness_shm = shared_memory.SharedMemory(name=fitness_name)
+    _worker.update(
+        genomes_shm=genomes_shm,
+        scales_shm=scales_shm,
+        fitness_shm=fitness_shm,
+        genomes=np.ndarray(shape, dtype=WEIGHT_DTYPES[dtype], buffer=genomes_shm.buf),
+        scales=np.ndarray((shape[0], len(layout)), dtype=np.float32, buffer=scales_shm.buf),
+        fitness=np.ndarray(shape[0], dtype=np.float64, buffer=fitness_shm.buf),
+        config=config, layout=layout, episodes=episodes, max_steps=max_steps, seed=seed,
+    )
+
+def _evaluate_range(task):
+    start, end, generation = task
+    w = _worker
+    # Все особи поколения играют одни и те же эпизоды; у каждого эпизода свой независимый поток
+    seeds = [np.random.SeedSequence(w['seed'], spawn_key=(generation, e)) for e in range(w['episodes'])]
+    for i in range(start, end):
+        genome = dequantize(w['genomes'][i], w['scales'][i], w['layout'])
+        total = sum(run_episode(w['config'], genome, w['layout'], s, w['max_steps']) for s in seeds)
+        w['fitness'][i] = total / w['episodes']
+    return end - start
+
+
+class ParallelEvaluator:
+    """Оценка поколения GA в пуле процессов: геномы и фитнес лежат в общей памяти.
+
+    weights_dtype ('float32', 'float16', 'int8') - формат геномов в общей памяти;
+    воркеры восстанавливают float32 только для особи, которую сейчас играют.
+    """
+
+    def __init__(self, config, team_config, population_size, genome_size, layout,
+                 workers=None, episodes=3, max_steps=2000, seed=None, weights_dtype='float32'):
+        self.population_size = population_size
+        self.workers = workers or os.cpu_count() or 1
+        # Энтропию фиксируем здесь, иначе при seed=None каждый воркер взял бы свою
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.layout = layout
+        shape = (population_size, genome_size)
+        dtype = WEIGHT_DTYPES[weights_dtype]
+
+        self._genomes_shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        self._scales_shm = shared_memory.SharedMemory(create=True, size=population_size * len(layout) * 4)
+        self._fitness_shm = shared_memory.SharedMemory(create=True, size=population_size * 8)
+        self.genomes = np.ndarray(shape, dtype=dtype, buffer=self._genomes_shm.buf)
+        self.scales = np.ndarray((population_size, len(layout)), dtype=np.float32, buffer=self._scales_shm.buf)
+        self.fitness = np.ndarray(population_size, dtype=np.float64, buffer=self._fitness_shm.buf)
+
+        self.pool = mp.Pool(
+            self.workers, initializer=_init_worker,
+            initargs=(self._genomes_shm.name, self._scales_shm.name, self._fitness_shm.name, shape, weights_dtype,
+                      episode_config(config, team_config), layout, episodes, max_steps, self.seed),
+        )
+
+    def evaluate(self, population, generation=0):
+        n = len(population)
+        quantize(population, self.layout, out=self.genomes[:n], scales=self.scales[:n])
+        # Мелкие куски для балансировки: эпизоды сильно отличаются по длине
+        chunk = max(1, n // (self.workers * 4))
+        tasks = [(s, min(s + chunk, n), generation) for s in range(0, n, chunk)]
+        for _ in self.pool.imap_unordered(_evaluate_range, tasks):
+            pass
+        return self.fitness[:n].copy()
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        for shm in (self._genomes_shm, self._scales_shm, self._fitness_shm):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,37 +1,209 @@
+import numpy as np
 import torch
-import copy
-import random
+from collections import namedtuple
+
+# Ссылка на особь для пакетного вывода: weights - сложенные веса буфера поколения.
+# Буфер не переиспользуется, пока особь, выданная через next_individual, не вернула результат
+PopulationMember = namedtuple('PopulationMember', 'weights, idx')
+
+def param_layout(model):
+    """[(смещение, форма)] параметров модели внутри плоского вектора весов."""
+    layout = []
+    offset = 0
+    for param in model.parameters():
+        layout.append((offset, tuple(param.shape)))
+        offset += param.numel()
+    return layout
+
+def flatten_params(model):
+    return torch.cat([p.detach().reshape(-1) for p in model.parameters()]).numpy().astype(np.float32)
+
+def load_flat_params(model, flat):
+    row = torch.from_numpy(np.asarray(flat, dtype=np.float32))
+    with torch.no_grad():
+        for (offset, shape), param in zip(param_layout(model), model.parameters()):
+            param.copy_(row[offset:offset + param.numel()].view(shape))
+    return model
 
 class GATrainer:
-    def __init__(self, model_class):
+    """Популяция как строки одной матрицы float32; отбор, скрещивание и мутация - векторно на всё поколение.
+
+    Модели для игры - представления (views) над строками, без копирования весов; SnakeNet-представление
+    строки создается только по запросу get_model, для пакетного вывода хватает get_member.
+    Буфер поколения не переиспользуется, пока выданные из него особи ещё играют: next_individual
+    отмечает особь как играющую, report снимает отметку. Особь, доигравшая после эволюции своего
+    поколения, не теряется - её результат попадает в следующий отбор вместе с текущим поколением.
+    """
+
+    def __init__(self, model_class, population_size=50, elite=2, tournament_size=3,
+                 mutation_rate=0.2, mutation_scale=0.3, seed=None):
         self.model_class = model_class
-        self.best_model_state = None
+        self.population_size = population_size
+        self.elite = min(elite, population_size)
+        self.tournament_size = tournament_size
+        self.mutation_rate = mutation_rate
+        self.mutation_scale = mutation_scale
+        # Свой генератор для начальной популяции, отбора и мутаций; model_class должен принимать seed
+        self.rng = np.random.default_rng(seed)
+
+        template = model_class()
+        self.layout = param_layout(template)
+        self.genome_size = sum(p.numel() for p in template.parameters())
+
+        # Обычно хватает двух буферов; третий и следующие появляются, только пока старые особи доигрывают
+        self._buffers = []
+        # (буфер, индекс) -> SnakeNet-представление строки, создается при первом get_model
+        self._views = {}
+        self._stacked = []
+        for _ in range(2):
+            self._add_buffer()
+        for i in range(population_size):
+            self._buffers[0][i] = flatten_params(model_class(seed=int(self.rng.integers(2 ** 63))))
+
+        self.generation = 1
+        # поколение -> номер буфера, для текущего и ещё играющих поколений
+        self._generation_buffer = {1: 0}
+        # поколение -> индексы выданных, но ещё не вернувших результат особей
+        self._in_play = {}
+        # [(геном, fitness)] особей прошлых поколений, доигравших после эволюции
+        self._late = []
+        self.fitness = np.full(population_size, np.nan)
+        self._next = 0
         self.best_fitness = -1e9
+        self.best_genome = self._buffers[0][0].copy()
+
+    def _add_buffer(self):
+        buffer = np.empty((self.population_size, self.genome_size), dtype=np.float32)
+        self._buffers.append(buffer)
+        self._stacked.append(self._make_stacked(buffer))
+        return len(self._buffers) - 1
+
+    def _free_buffer(self):
+        used = set(self._generation_buffer.values())
+        for b in range(len(self._buffers)):
+            if b not in used:
+                return b
+        return self._add_buffer()
+
+    def _release(self, generation):
+        """Отпускает буфер прошлого поколения, когда в нём не осталось играющих особей."""
+        if generation != self.generation and not self._in_play.get(generation):
+            self._in_play.pop(generation, None)
+            self._generation_buffer.pop(generation, None)
+
+    def _buffer_index(self, generation):
+        return self._generation_buffer[generation]
+
+    @property
+    def population(self):
+        return self._buffers[self._buffer_index(self.generation)]
 
-    def save_candidate(self, model, fitness):
-        # Если эта змейка лучше всех, что мы видели - запоминаем её "гены"
+    def _make_view(self, buffer, i):
+        model = self.model_class()
+        row = torch.from_numpy(buffer[i])
+        for (offset, shape), param in zip(self.layout, model.parameters()):
+            param.data = row[offset:offset + param.numel()].view(shape)
+        model.eval()
+        return model
+
+    def _make_stacked(self, buffer):
+        # 3-D представления весов всей популяции для population_forward, без копирования
+        flat = torch.from_numpy(buffer)
+        return tuple(
+            flat[:, offset:offset + int(np.prod(shape))].view(self.population_size, *shape)
+            for offset, shape in self.layout
+        )
+
+    def stacked_weights(self, generation):
+        return self._stacked[self._buffer_index(generation)]
+
+    def get_member(self, generation, idx):
+        """Особь для пакетного вывода; её веса не меняются до report, даже если поколение уже сменилось."""
+        return PopulationMember(self.stacked_weights(generation), idx)
+
+    def get_model(self, generation, idx):
+        key = (self._buffer_index(generation), idx)
+        if key not in self._views:
+            self._views[key] = self._make_view(self._buffers[key[0]], idx)
+        return self._views[key]
+
+    def next_individual(self):
+        """(поколение, индекс) следующей особи для оценки; при исчерпании поколения - эволюция."""
+        if self._next >= self.population_size:
+            self.evolve()
+        idx = self._next
+        self._next += 1
+        self._in_play.setdefault(self.generation, set()).add(idx)
+        return self.generation, idx
+
+    def report(self, generation, idx, fitness):
+        """Результат особи; True, если это новый рекорд."""
+        in_play = self._in_play.get(generation, ())
+        playing = idx in in_play
+        if generation == self.generation:
+            self.fitness[idx] = fitness
+            genome = self.population[idx]
+        elif playing:
+            # Поколение уже эволюционировало, пока особь играла: она участвует в следующем отборе
+            genome = self._buffers[self._buffer_index(generation)][idx]
+            self._late.append((genome.copy(), fitness))
+        else:
+            return False
         if fitness > self.best_fitness:
             self.best_fitness = fitness
-            self.best_model_state = copy.deepcopy(model.state_dict())
-            return True # Сообщаем, что рекорд побит
-        return False
-
-    def get_offspring(self, mutation_rate=0.2):
-        new_model = self.model_class()
-        
-        # Если у нас еще нет "чемпиона", даем случайные веса
-        if self.best_model_state is None:
-            return new_model
-            
-        # Загружаем гены лучшего
-        new_model.load_state_dict(self.best_model_state)
-        
-        # Жестко мутируем веса
-        with torch.no_grad():
-            for param in new_model.parameters():
-                # Мутируем только часть весов, чтобы не разрушить мозг полностью
-                mask = torch.rand_like(param) < mutation_rate
-                # Добавляем сильный шум
-                param.add_(mask * torch.randn_like(param) * 0.3)
-                
-        return new_model
\ No newline at end of file
+            self.best_genome[:] = genome
+            improved = True
+        else:
+            improved = False
+        if playing:
+            in_play.discard(idx)
+            self._release(generation)
+        return improved
+
+    def evolve(self):
+        pop = self.population
+        fit = np.where(np.isnan(self.fitness), -np.inf, self.fitness)
+        if self._late:
+            pop = np.concatenate([pop, np.stack([genome for genome, _ in self._late])])
+            fit = np.concatenate([fit, [value for _, value in self._late]])
+            self._late.clear()
+        new_buffer = self._free_buffer()
+        new = self._buffers[new_buffer]
+        n_child = self.population_size - self.elite
+
+        # Элита переходит без изменений
+        order = np.argsort(-fit, kind='stable')
+        new[:self.elite] = pop[order[:self.elite]]
+
+        if n_child > 0:
+            # Турнирный отбор обоих родителей для всех детей сразу
+            cand = self.rng.integers(0, len(pop), size=(2, n_child, self.tournament_size))
+            winners = np.take_along_axis(cand, fit[cand].argmax(axis=-1)[..., None], axis=-1)[..., 0]
+
+            # Равномерное скрещивание
+            mask = self.rng.random((n_child, self.genome_size)) < 0.5
+            children = new[self.elite:]
+            np.copyto(children, pop[winners[0]])
+            np.copyto(children, pop[winners[1]], where=mask)
+
+            # Мутируем только часть весов, чтобы не разрушить мозг полностью
+            mutate = self.rng.random((n_child, self.genome_size)) < self.mutation_rate
+            noise = self.rng.standard_normal((n_child, self.genome_size), dtype=np.float32)
+            children += mutate * noise * np.float32(self.mutation_scale)
+
+        self.generation += 1
+        self._generation_buffer[self.generation] = new_buffer
+        self._release(self.generation - 1)
+        self.fitness.fill(np.nan)
+        self._next = 0
+
+    def evaluate_generation(self, evaluator):
+        """Оценивает всё текущее поколение через evaluator (например, ParallelEvaluator) и переходит к следующему."""
+        fitness = evaluator.evaluate(self.population, self.generation)
+        for idx, value in enumerate(fitness):
+            self.report(self.generation, idx, float(value))
+        self.evolve()
+        return fitness
+
+    def best_model(self):
+        return load_flat_params(self.model_class(), self.best_genome)
@@ -4,10 +4,21 @@ import torch.nn.functional as F
 import os
 
 class SnakeNet(nn.Module):
-    def __init__(self, input_size=11, hidden_size=256, output_size=3):
+    def __init__(self, input_size=11, hidden_size=256, output_size=3, seed=None):
         super().__init__()
         self.linear1 = nn.Linear(input_size, hidden_size)
         self.linear2 = nn.Linear(hidden_size, output_size)
+        if seed is not None:
+            self.reset_parameters(seed)
+
+    def reset_parameters(self, seed):
+        """Инициализация как у nn.Linear, но из своего torch.Generator, не трогая глобальный."""
+        generator = torch.Generator().manual_seed(int(seed))
+        with torch.no_grad():
+            for layer in (self.linear1, self.linear2):
+                bound = 1.0 / layer.in_features ** 0.5
+                layer.weight.uniform_(-bound, bound, generator=generator)
+                layer.bias.uniform_(-bound, bound, generator=generator)
 
     def forward(self, x):
         if not isinstance(x, torch.Tensor):
@@ -17,6 +28,11 @@ class SnakeNet(nn.Module):
         x = F.relu(self.linear1(x))
         return self.linear2(x)
 
+    def export_numpy(self):
+        """Копия весов для вывода без torch (см. NumpySnakeNet)."""
+        from src.ai.numpy_net import NumpySnakeNet
+        return NumpySnakeNet.from_model(self)
+
     def save(self, file_name='model.pth'):
         model_folder_path = './model'
         if not os.path.exists(model_folder_path):
@@ -32,4 +48,19 @@ class SnakeNet(nn.Module):
             self.eval()
             print(f"--- Model loaded: {path} ---")
             return True
-        return False
\ No newline at end of file
+        return False
+
+def population_forward(weights, idx, x):
+    """Прямой проход сразу для многих особей популяции SnakeNet.
+
+    weights - сложенные по популяции (W1 (P, H, I), b1 (P, H), W2 (P, O, H), b2 (P, O)),
+    idx - индекс особи для каждой строки x (m, I).
+    """
+    W1, b1, W2, b2 = weights
+    idx = torch.as_tensor(idx)
+    if len(idx) == len(W1) and torch.equal(idx, torch.arange(len(W1))):
+        # Вся популяция по порядку: обходимся без копирования весов
+        h = F.relu(torch.bmm(W1, x.unsqueeze(2)).squeeze(2) + b1)
+        return torch.bmm(W2, h.unsqueeze(2)).squeeze(2) + b2
+    h = F.relu(torch.bmm(W1[idx], x.unsqueeze(2)).squeeze(2) + b1[idx])
+    return torch.bmm(W2[idx], h.unsqueeze(2)).squeeze(2) + b2[idx]
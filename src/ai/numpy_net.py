@@ -0,0 +1,64 @@
+import numpy as np
+from src.ai.quantize import dequantize
+
+class NumpySnakeNet:
+    """Копия весов SnakeNet в непрерывных массивах NumPy только для вывода: relu(x @ W1 + b1) @ W2 + b2.
+
+    Модуль не импортирует torch, поэтому подходит для акторов и воркеров.
+    После шагов обучения веса обновляются вызовом refresh / refresh_flat.
+    """
+
+    def __init__(self, W1, b1, W2, b2):
+        # Храним транспонированные матрицы: x @ W1 без копирования на каждом вызове
+        self.W1 = np.ascontiguousarray(np.asarray(W1, dtype=np.float32).T)
+        self.b1 = np.array(b1, dtype=np.float32)
+        self.W2 = np.ascontiguousarray(np.asarray(W2, dtype=np.float32).T)
+        self.b2 = np.array(b2, dtype=np.float32)
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(*_model_arrays(model))
+
+    @classmethod
+    def from_flat(cls, flat, layout):
+        return cls(*_flat_arrays(flat, layout))
+
+    def refresh(self, model):
+        self._copy(*_model_arrays(model))
+        return self
+
+    def refresh_flat(self, flat, layout):
+        self._copy(*_flat_arrays(flat, layout))
+        return self
+
+    def refresh_quantized(self, values, scales, layout):
+        """Веса из квантованного снимка (см. src.ai.quantize)."""
+        return self.refresh_flat(dequantize(values, scales, layout), layout)
+
+    def _copy(self, W1, b1, W2, b2):
+        np.copyto(self.W1, W1.T)
+        np.copyto(self.b1, b1)
+        np.copyto(self.W2, W2.T)
+        np.copyto(self.b2, b2)
+
+    def predict(self, x):
+        """Q-значения для x формы (11,) или (m, 11)."""
+        x = np.asarray(x, dtype=np.float32)
+        h = x @ self.W1
+        h += self.b1
+        np.maximum(h, 0.0, out=h)
+        q = h @ self.W2
+        q += self.b2
+        return q
+
+    def act(self, x):
+        return self.predict(x).argmax(axis=-1)
+
+def _model_arrays(model):
+    return (
+        model.linear1.weight.detach().numpy(), model.linear1.bias.detach().numpy(),
+        model.linear2.weight.detach().numpy(), model.linear2.bias.detach().numpy(),
+    )
+
+def _flat_arrays(flat, layout):
+    return tuple(flat[offset:offset + int(np.prod(shape))].reshape(shape) for offset, shape in layout)
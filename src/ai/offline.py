@@ -0,0 +1,81 @@
+import numpy as np
+from src.core.trajectory import open_trajectory
+
+class TrajectoryDataset:
+    """Несколько файлов траекторий (TrajectoryWriter) как один набор переходов.
+
+    Записи остаются в memmap: в память попадают только строки запрошенного минибатча.
+    teams - имена команд, чьи переходы берём (None - все); reward_fn(records) -> rewards
+    позволяет пересчитать награды по полям записи (reward, done, death_reason, ...).
+    """
+
+    def __init__(self, paths, teams=None, reward_fn=None):
+        if isinstance(paths, str):
+            paths = [paths]
+        self.paths = list(paths)
+        self.reward_fn = reward_fn
+        self.files = []
+        # Для каждого файла - номера выбранных записей (None - все подряд)
+        self.rows = []
+        sizes = []
+        for path in self.paths:
+            records, meta = open_trajectory(path)
+            selected = None
+            if teams is not None:
+                codes = [i for i, name in enumerate(meta['teams']) if name in teams]
+                selected = np.flatnonzero(np.isin(records['team'], codes))
+            self.files.append(records)
+            self.rows.append(selected)
+            sizes.append(len(records) if selected is None else len(selected))
+        # Глобальный индекс i лежит в файле f, если offsets[f] <= i < offsets[f + 1]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def gather(self, idx, states, actions, rewards, next_states, dones):
+        """Как ReplayBuffer.gather: переходы idx в заранее выделенные массивы."""
+        idx = np.asarray(idx)
+        file_ids = np.searchsorted(self.offsets, idx, side='right') - 1
+        for f in np.unique(file_ids):
+            pos = np.flatnonzero(file_ids == f)
+            local = idx[pos] - self.offsets[f]
+            if self.rows[f] is not None:
+                local = self.rows[f][local]
+            batch = self.files[f][local]
+            states[pos] = batch['state']
+            actions[pos] = batch['action']
+            rewards[pos] = batch['reward'] if self.reward_fn is None else self.reward_fn(batch)
+            next_states[pos] = batch['next_state']
+            dones[pos] = batch['done']
+
+
+class OfflineTrainer:
+    """Эпохи обучения RLTrainer по TrajectoryDataset: перемешивание - перестановкой индексов."""
+
+    def __init__(self, trainer, dataset, batch_size=256, seed=None):
+        self.trainer = trainer
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self.epoch = 0
+
+    def run_epoch(self):
+        """Одна эпоха; неполный последний батч пропускаем, чтобы буферы тренера не менялись. Возвращает средний loss."""
+        n = len(self.dataset)
+        order = self.rng.permutation(n)
+        losses = []
+        for start in range(0, n - self.batch_size + 1, self.batch_size):
+            # Сортировка внутри батча не меняет его состав, но читает memmap по возрастанию адресов
+            idx = np.sort(order[start:start + self.batch_size])
+            losses.append(self.trainer.train_indices(self.dataset, idx))
+        self.epoch += 1
+        return float(np.mean(losses)) if losses else None
+
+    def fit(self, epochs, log=print):
+        for _ in range(epochs):
+            loss = self.run_epoch()
+            if log is not None:
+                log(f"[OFFLINE] Epoch {self.epoch}: loss={loss if loss is None else round(loss, 4)}, "
+                    f"transitions={len(self.dataset)}")
+        return self.trainer.model
@@ -0,0 +1,41 @@
+import numpy as np
+
+# Форматы хранения весов: имя -> dtype значений
+WEIGHT_DTYPES = {'float32': np.float32, 'float16': np.float16, 'int8': np.int8}
+
+def _segments(layout):
+    return [(offset, offset + int(np.prod(shape))) for offset, shape in layout]
+
+def quantize(flat, layout, dtype='int8', out=None, scales=None):
+    """Квантует вектор весов (G,) или матрицу популяции (P, G) с отдельным масштабом на каждый тензор.
+
+    Возвращает (values, scales), scales формы (..., число тензоров); для float32/float16 масштабы равны 1.
+    """
+    flat = np.asarray(flat, dtype=np.float32)
+    if out is None:
+        out = np.empty(flat.shape, dtype=WEIGHT_DTYPES[dtype])
+    if scales is None:
+        scales = np.empty(flat.shape[:-1] + (len(layout),), dtype=np.float32)
+    if out.dtype != np.int8:
+        scales[...] = 1.0
+        np.copyto(out, flat, casting='unsafe')
+        return out, scales
+
+    # Симметричное int8: масштаб = max|w| / 127 для каждого тензора
+    for t, (a, b) in enumerate(_segments(layout)):
+        segment = flat[..., a:b]
+        scale = np.abs(segment).max(axis=-1) / 127.0
+        scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+        scales[..., t] = scale
+        out[..., a:b] = np.clip(np.rint(segment / scale[..., None]), -127, 127)
+    return out, scales
+
+def dequantize(values, scales, layout, out=None):
+    """Обратно в float32 той же формы, что values."""
+    if out is None:
+        out = np.empty(values.shape, dtype=np.float32)
+    np.copyto(out, values, casting='unsafe')
+    if values.dtype == np.int8:
+        for t, (a, b) in enumerate(_segments(layout)):
+            out[..., a:b] *= scales[..., t, None]
+    return out
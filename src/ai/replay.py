@@ -0,0 +1,119 @@
+import numpy as np
+
+class ReplayBuffer:
+    """Кольцевой буфер опыта на заранее выделенных массивах NumPy."""
+
+    def __init__(self, capacity=100_000, state_size=11, seed=None):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+        self.pos = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        n = len(actions)
+        idx = (self.pos + np.arange(n)) % self.capacity
+        self.states[idx] = states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_states[idx] = next_states
+        self.dones[idx] = dones
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+        return idx
+
+    def sample_indices(self, batch_size):
+        return self.rng.integers(0, self.size, size=batch_size)
+
+    def get(self, idx):
+        return self.states[idx], self.actions[idx], self.rewards[idx], self.next_states[idx], self.dones[idx]
+
+    def gather(self, idx, states, actions, rewards, next_states, dones):
+        """Как get, но копирует в заранее выделенные массивы: без новых аллокаций на каждый батч.
+
+        mode='clip': индексы и так в пределах буфера, а с mode='raise' и out NumPy копирует через временный массив.
+        """
+        np.take(self.states, idx, axis=0, out=states, mode='clip')
+        np.take(self.actions, idx, out=actions, mode='clip')
+        np.take(self.rewards, idx, out=rewards, mode='clip')
+        np.take(self.next_states, idx, axis=0, out=next_states, mode='clip')
+        np.take(self.dones, idx, out=dones, mode='clip')
+
+
+class SumTree:
+    """Сумма-дерево на массиве: выборка и обновление приоритетов за O(batch * log capacity)."""
+
+    def __init__(self, capacity):
+        self.leaf_offset = 1
+        self.depth = 0
+        while self.leaf_offset < capacity:
+            self.leaf_offset *= 2
+            self.depth += 1
+        # Корень в tree[1], листья в tree[leaf_offset:]
+        self.tree = np.zeros(2 * self.leaf_offset, dtype=np.float64)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def update(self, idx, priorities):
+        pos = np.asarray(idx) + self.leaf_offset
+        self.tree[pos] = priorities
+        for _ in range(self.depth):
+            pos = pos // 2
+            # Пересчет из детей, поэтому повторяющиеся родители не ломают суммы
+            self.tree[pos] = self.tree[2 * pos] + self.tree[2 * pos + 1]
+
+    def find(self, values):
+        values = np.array(values, dtype=np.float64)
+        pos = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * pos
+            left_sum = self.tree[left]
+            go_right = values > left_sum
+            values = np.where(go_right, values - left_sum, values)
+            pos = np.where(go_right, left + 1, left)
+        return pos - self.leaf_offset
+
+    def get(self, idx):
+        return self.tree[np.asarray(idx) + self.leaf_offset]
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """ReplayBuffer с выборкой пропорционально TD-ошибке и весами importance sampling."""
+
+    def __init__(self, capacity=100_000, state_size=11, alpha=0.6, beta=0.4, eps=1e-5, seed=None):
+        super().__init__(capacity, state_size, seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.eps = eps
+        self.max_priority = 1.0
+        self.tree = SumTree(capacity)
+
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        idx = super().push_batch(states, actions, rewards, next_states, dones)
+        self.tree.update(idx, self.max_priority ** self.alpha)
+        return idx
+
+    def sample_indices(self, batch_size):
+        # Стратифицированная выборка: по одному значению на отрезок суммы
+        segment = self.tree.total / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        return np.minimum(self.tree.find(values), self.size - 1)
+
+    def weights(self, idx):
+        probs = self.tree.get(idx) / self.tree.total
+        w = (self.size * probs) ** (-self.beta)
+        return (w / w.max()).astype(np.float32)
+
+    def update_priorities(self, idx, td_errors):
+        p = np.abs(td_errors) + self.eps
+        self.max_priority = max(self.max_priority, float(p.max()))
+        self.tree.update(idx, p ** self.alpha)
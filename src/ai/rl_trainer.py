@@ -1,15 +1,24 @@
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from collections import deque
+from src.ai.replay import ReplayBuffer, PrioritizedReplayBuffer
 
 class RLTrainer:
-    def __init__(self, model, lr=0.001, gamma=0.9):
+    def __init__(self, model, lr=0.001, gamma=0.9, memory_size=100_000, prioritized=False, memory=None, seed=None):
         self.model = model
         self.gamma = gamma
-        self.optimizer = optim.Adam(model.parameters(), lr=lr)
+        self.optimizer = optim.Adam(model.parameters(), lr=lr, fused=True)
         self.criterion = nn.MSELoss()
-        self.memory = deque(maxlen=100_000)
+        if memory is None:
+            buffer_class = PrioritizedReplayBuffer if prioritized else ReplayBuffer
+            memory = buffer_class(memory_size, model.linear1.in_features, seed=seed)
+        self.memory = memory
+        self._batch = None
+
+    def remember_batch(self, states, actions, rewards, next_states, dones):
+        """Переходы всех змеек команды за тик одним вызовом."""
+        self.memory.push_batch(states, actions, rewards, next_states, dones)
 
     def train_step(self, state, action, reward, next_state, done):
         state = torch.tensor(state, dtype=torch.float)
@@ -29,4 +38,113 @@ class RLTrainer:
         loss = self.criterion(target, pred)
         loss.backward()
         self.optimizer.step()
-        return loss.item()
\ No newline at end of file
+        return loss.item()
+
+    def train_batch(self, batch_size=256):
+        """Один шаг оптимизатора на случайном минибатче из буфера опыта."""
+        if len(self.memory) < batch_size:
+            return None
+        b = self._batch_buffers(batch_size)
+        idx = self.memory.sample_indices(batch_size)
+        self.memory.gather(idx, b['states'], b['actions'], b['rewards'], b['next_states'], b['dones'])
+        if isinstance(self.memory, PrioritizedReplayBuffer):
+            np.copyto(b['weights'], self.memory.weights(idx))
+            loss, td_errors = self._optimize(b, weighted=True)
+            self.memory.update_priorities(idx, td_errors)
+            return loss
+        loss, _ = self._optimize(b)
+        return loss
+
+    def train_indices(self, source, idx):
+        """Шаг оптимизатора на переходах idx из source - буфера опыта или TrajectoryDataset (нужен gather)."""
+        b = self._batch_buffers(len(idx))
+        source.gather(idx, b['states'], b['actions'], b['rewards'], b['next_states'], b['dones'])
+        loss, _ = self._optimize(b)
+        return loss
+
+    def _batch_buffers(self, batch_size):
+        """Массивы минибатча и промежуточные тензоры шага, выделенные один раз на размер батча."""
+        if self._batch is not None and self._batch['size'] == batch_size:
+            return self._batch
+        n = batch_size
+        hidden = self.model.linear1.out_features
+        outputs = self.model.linear2.out_features
+        # s и s' лежат в одном массиве, чтобы Q(s) и Q(s') считались одним forward
+        stacked = np.zeros((2 * n, self.model.linear1.in_features), dtype=np.float32)
+        b = {
+            'stacked': stacked,
+            'states': stacked[:n],
+            'next_states': stacked[n:],
+            'actions': np.zeros(n, dtype=np.int64),
+            'rewards': np.zeros(n, dtype=np.float32),
+            'dones': np.zeros(n, dtype=np.float32),
+            'not_done': np.zeros(n, dtype=np.float32),
+            'weights': np.ones(n, dtype=np.float32),
+            'td': np.zeros(n, dtype=np.float32),
+        }
+        t = {name: torch.from_numpy(array) for name, array in b.items()}
+        t['actions'] = t['actions'].unsqueeze(1)
+        t.update(
+            hidden=torch.zeros(2 * n, hidden), q=torch.zeros(2 * n, outputs),
+            target=torch.zeros(n), q_taken=torch.zeros(n, 1), err=torch.zeros(n), grad=torch.zeros(n),
+            d_q=torch.zeros(n, outputs), d_hidden=torch.zeros(n, hidden), relu_mask=torch.zeros(n, hidden),
+        )
+        for param in self.model.parameters():
+            if param.grad is None:
+                param.grad = torch.zeros_like(param)
+        b['t'] = t
+        b['size'] = n
+        self._batch = b
+        return b
+
+    @torch.no_grad()
+    def _optimize(self, b, weighted=False):
+        """Шаг DQN для SnakeNet (linear1 -> relu -> linear2) с ручным backward в буферы из _batch_buffers.
+
+        Градиент тот же, что у MSE по всей матрице Q(s) с target, равным Q(s) вне выбранных действий.
+        Возвращает (loss, TD-ошибки по батчу).
+        """
+        t = b['t']
+        n = b['size']
+        W1, b1 = self.model.linear1.weight, self.model.linear1.bias
+        W2, b2 = self.model.linear2.weight, self.model.linear2.bias
+        x, h, q = t['stacked'], t['hidden'], t['q']
+
+        torch.addmm(b1, x, W1.t(), out=h)
+        h.clamp_(min=0)
+        torch.addmm(b2, h, W2.t(), out=q)
+
+        # target = r + gamma * max Q(s') * (1 - done)
+        np.subtract(1.0, b['dones'], out=b['not_done'])
+        target = t['target']
+        torch.amax(q[n:], dim=1, out=target)
+        target.mul_(t['not_done']).mul_(self.gamma).add_(t['rewards'])
+
+        err, grad = t['err'], t['grad']
+        torch.gather(q[:n], 1, t['actions'], out=t['q_taken'])
+        torch.sub(t['q_taken'].view(n), target, out=err)
+        if weighted:
+            torch.mul(err, t['weights'], out=grad)
+        else:
+            grad.copy_(err)
+        scale = 1.0 / (n * q.shape[1])
+        loss = torch.dot(grad, err).item() * scale
+
+        # dL/dQ(s, a) = 2 * w * err / numel, по остальным действиям ноль
+        grad.mul_(2.0 * scale)
+        d_q = t['d_q']
+        d_q.zero_()
+        d_q.scatter_(1, t['actions'], grad.view(n, 1))
+        torch.mm(d_q.t(), h[:n], out=W2.grad)
+        torch.sum(d_q, dim=0, out=b2.grad)
+
+        d_h = t['d_hidden']
+        torch.mm(d_q, W2, out=d_h)
+        torch.sign(h[:n], out=t['relu_mask'])
+        d_h.mul_(t['relu_mask'])
+        torch.mm(d_h.t(), x[:n], out=W1.grad)
+        torch.sum(d_h, dim=0, out=b1.grad)
+
+        self.optimizer.step()
+        torch.neg(err, out=t['td'])
+        return loss, b['td']
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
 
 @dataclass
 class RewardConfig:
@@ -49,12 +49,35 @@ class GameConfig:
     sidebar_width: int = 300
     fps_train: int = 0
     fps_watch: int = 15
+    render_every: int = 1
+    render_max_hz: float = 0.0
+    viewer_process: bool = True
     food_count: int = 6
     initial_snake_length: int = 3
     max_steps_without_food: int = 200
     
+    # Корневой seed запуска в main.py: из него порождаются seed всех генераторов (None - случайный, печатается при старте).
+    # Компоненты сами его не читают - seed передается им явно
+    seed: Optional[int] = None
+    
     # ! Analytics
     stats_interval: int = 1000
+    stats_enabled: bool = True
+    # Таймеры фаз тика (сайдбар и колонки CSV)
+    profile_phases: bool = True
+    
+    # ! Training
+    memory_size: int = 100_000
+    batch_size: int = 256
+    # Шаг оптимизатора раз в K тиков: переходы всех змеек команды за эти тики копятся в буфере
+    train_every: int = 1
+    prioritized_replay: bool = False
+    
+    # ! Genetic
+    ga_population_size: int = 50
+    ga_elite: int = 2
+    # Формат весов в общей памяти воркеров и акторов: float32, float16 или int8
+    weights_dtype: str = "float32"
     
     rewards: RewardConfig = field(default_factory=RewardConfig)
     teams: List[TeamConfig] = field(default_factory=lambda: [
@@ -1,11 +1,16 @@
 from .engine import GameEngine
+from .vec_engine import VecGameEngine
 from .snake import Snake
 from .types import Point, Direction, GameStateDTO
+from .trajectory import TrajectoryWriter, open_trajectory
 
 __all__ = [
     "GameEngine",
+    "VecGameEngine",
     "Snake",
     "Point",
     "Direction",
-    "GameStateDTO"
+    "GameStateDTO",
+    "TrajectoryWriter",
+    "open_trajectory"
 ]
\ No newline at end of file
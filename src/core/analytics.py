@@ -2,6 +2,7 @@ import csv
 import os
 from datetime import datetime
 from src.core.types import DeathReason
+from src.core.profiler import PHASES
 
 class AnalyticsEngine:
     def __init__(self, config):
@@ -9,6 +10,10 @@ class AnalyticsEngine:
         self.history = []
         self.teams = [t.name for t in config.teams]
         self.current_interval_stats = self._init_interval_stats()
+        self.enabled = config.stats_enabled
+        self.csv_filename = None
+        if not self.enabled:
+            return
         
         self.stats_dir = "stats"
         if not os.path.exists(self.stats_dir):
@@ -32,7 +37,7 @@ class AnalyticsEngine:
             "Cause_Self", 
             "Cause_Enemy", 
             "Cause_Starve"
-        ]
+        ] + [f"T_{phase}_ms" for phase in PHASES]
         with open(self.csv_filename, mode='w', newline='') as f:
             writer = csv.writer(f)
             writer.writerow(headers)
@@ -52,22 +57,25 @@ class AnalyticsEngine:
             }
         return stats
 
-    def log_food(self, team_name: str):
+    def log_food(self, team_name: str, count: int = 1):
         if team_name in self.current_interval_stats:
-            self.current_interval_stats[team_name]['apples'] += 1
+            self.current_interval_stats[team_name]['apples'] += count
 
-    def log_death(self, team_name: str, reason: int):
+    def log_death(self, team_name: str, reason: int, count: int = 1):
         if team_name in self.current_interval_stats:
-            self.current_interval_stats[team_name]['deaths'] += 1
+            self.current_interval_stats[team_name]['deaths'] += count
             if reason in self.current_interval_stats[team_name]['causes']:
-                self.current_interval_stats[team_name]['causes'][reason] += 1
+                self.current_interval_stats[team_name]['causes'][reason] += count
 
-    def update(self, current_iteration: int):
+    def update(self, current_iteration: int, timer=None):
+        if not self.enabled:
+            return
         if current_iteration > 0 and current_iteration % self.config.stats_interval == 0:
-            self._finalize_interval(current_iteration)
+            timings = timer.interval_means() if timer is not None and timer.enabled else None
+            self._finalize_interval(current_iteration, timings)
 
-    def _finalize_interval(self, iteration: int):
-        self._write_to_csv(iteration)
+    def _finalize_interval(self, iteration: int, timings=None):
+        self._write_to_csv(iteration, timings)
         
         print(f"\n[ANALYTICS] Iteration {iteration} Summary:")
         for team_name, stats in self.current_interval_stats.items():
@@ -75,10 +83,14 @@ class AnalyticsEngine:
             deaths = stats['deaths']
             ratio = apples / deaths if deaths > 0 else apples
             print(f"  > Team {team_name}: Apples={apples}, Deaths={deaths}, A/D Ratio={ratio:.2f}")
+        if timings:
+            print("  > ms/tick: " + ", ".join(f"{phase}={timings[phase]:.3f}" for phase in PHASES))
 
         self.current_interval_stats = self._init_interval_stats()
 
-    def _write_to_csv(self, iteration):
+    def _write_to_csv(self, iteration, timings=None):
+        # Время фаз общее для всех команд, повторяется в строке каждой
+        timing_cols = [round(timings[phase], 4) if timings else "" for phase in PHASES]
         rows = []
         for team_name, stats in self.current_interval_stats.items():
             apples = stats['apples']
@@ -96,7 +108,7 @@ class AnalyticsEngine:
                 causes[DeathReason.SELF_COLLISION],
                 causes[DeathReason.ENEMY_COLLISION],
                 causes[DeathReason.STARVATION]
-            ]
+            ] + timing_cols
             rows.append(row)
             
         with open(self.csv_filename, mode='a', newline='') as f:
@@ -1,65 +1,119 @@
-import random
 import time
-import math
-from src.core.types import Point, GameStateDTO, GlobalStats, TeamStats, DeathReason
+import numpy as np
+from src.core.types import Point, GameStateDTO, GlobalStats, TeamStats, DeathReason, Cell
 from src.core.snake import Snake
+from src.core.grid import OccupancyGrid
+from src.core.food_index import FoodIndex
 from src.core.analytics import AnalyticsEngine
+from src.core.profiler import PhaseTimer
+
+def _no_clock():
+    return 0.0
 
 class GameEngine:
-    def __init__(self, config):
+    def __init__(self, config, seed=None):
         self.config = config
+        # Свой генератор на движок: seed (int или SeedSequence), None - энтропия ОС, как у остальных компонентов
+        self.rng = np.random.default_rng(seed)
         self.start_time = time.time()
         self.iteration = 0
         self.total_deaths = 0
         self.snakes = []
-        self.foods = []
+        self.food_index = FoodIndex()
+        self.foods = self.food_index.points
+        # (iteration, версия еды, ближайшая еда, расстояния в пикселях) для голов всех змеек
+        self._nearest_cache = None
         
         self.team_stats = {t.name: TeamStats() for t in config.teams}
         self.analytics = AnalyticsEngine(config)
+        self.timer = PhaseTimer(config.profile_phases)
+        self.grid = OccupancyGrid(config.grid_width, config.grid_height)
         
         for team in self.config.teams:
             for _ in range(team.count):
-                self.snakes.append(self._create_initial_snake(team))
+                snake = self._create_initial_snake(team)
+                snake.id = len(self.snakes) + 1
+                self._occupy_body(snake)
+                self.snakes.append(snake)
         
-        while len(self.foods) < self.config.food_count:
-            self._place_food()
+        # Причина смерти каждой змейки на последнем шаге (DeathReason.ALIVE, если жива)
+        self.death_reasons = np.zeros(len(self.snakes), dtype=np.int8)
+        self._refill_food()
 
     def _create_initial_snake(self, team_config):
-        x = random.randint(5, self.config.grid_width - 5) * self.config.block_size
-        y = random.randint(5, self.config.grid_height - 5) * self.config.block_size
-        return Snake(x, y, team_config, self.config.initial_snake_length, self.config.block_size)
+        body = self._find_spawn(5)
+        if body is None:
+            raise ValueError(f"No free cell to place a snake of team {team_config.name!r}, the grid is too small")
+        return Snake(body[0].x, body[0].y, team_config, len(body))
+
+    def _find_spawn(self, margin):
+        """Тело (голова первая) в окне с отступом margin, все клетки которого свободны.
+
+        На переполненной доске тело укорачивается вплоть до одной клетки; None - свободных клеток нет.
+        При респауне такого не бывает: тело погибшей змейки освобождается до поиска.
+        """
+        length = self.config.initial_snake_length
+        w, h = self.config.grid_width, self.config.grid_height
+        margin = min(margin, (min(w, h) - 1) // 2)
+        
+        # Обычно хватает нескольких случайных свободных клеток из пула
+        for _ in range(32):
+            p = self.grid.random_free_cell(self.rng)
+            if p is None: break
+            if margin <= p.x < w - margin and margin <= p.y < h - margin:
+                body = [Point(p.x - i, p.y) for i in range(length)]
+                if all(self.grid.at(pt) == Cell.EMPTY for pt in body):
+                    return body
+        
+        # Доска почти заполнена: полный поиск по сетке, затем без отступа и всё более короткое тело
+        for size, window in [(length, margin)] + [(n, 0) for n in range(length, 0, -1)]:
+            heads = self.grid.spawn_candidates(size, window)
+            if len(heads):
+                x, y = heads[self.rng.integers(len(heads))]
+                return [Point(int(x) - i, int(y)) for i in range(size)]
+        return None
+
+    def _occupy_body(self, snake):
+        for pt in snake.body:
+            if self.grid.at(pt) == Cell.FOOD:
+                self.food_index.remove(pt)
+            self.grid.occupy(pt, snake.id)
 
     def _respawn_snake_at_random(self, snake):
-        while True:
-            x = random.randint(2, self.config.grid_width - 3) * self.config.block_size
-            y = random.randint(2, self.config.grid_height - 3) * self.config.block_size
-            p = Point(x, y)
-            occupied = any(p in s.body for s in self.snakes if s != snake) or any(p == f for f in self.foods)
-            if not occupied:
-                snake.head = p
-                snake.body = []
-                for i in range(self.config.initial_snake_length):
-                    snake.body.append(Point(p.x - (i * self.config.block_size), p.y))
-                snake.direction = random.choice([1, 2, 3, 4])
-                snake.is_alive = True
-                snake.score = 0
-                snake.steps_alive = 0
-                snake.steps_since_last_food = 0
-                break
+        for pt in snake.body:
+            self.grid.release(pt, snake.id)
+            
+        snake.reset(self._find_spawn(2), int(self.rng.integers(1, 5)))
+        self._occupy_body(snake)
+        self._refill_food()
 
     def _place_food(self):
-        attempts = 0
-        while attempts < 100:
-            x = random.randint(0, self.config.grid_width - 1) * self.config.block_size
-            y = random.randint(0, self.config.grid_height - 1) * self.config.block_size
-            p = Point(x, y)
-            occupied = any(p in s.body for s in self.snakes) or (p in self.foods)
-            if not occupied:
-                self.foods.append(p)
-                break
-            attempts += 1
-
-    def _calculate_reward(self, snake, dist_before, dist_after, event_type):
+        p = self.grid.random_free_cell(self.rng)
+        if p is None:
+            return False
+        self.food_index.add(p)
+        self.grid.add_food(p)
+        return True
+
+    def _refill_food(self):
+        while len(self.foods) < self.config.food_count and self._place_food():
+            pass
+
+    def _danger_penalty(self, snake):
+        danger_penalty = 0.0
+        neighbors = [
+            Point(snake.head.x, snake.head.y - 1),
+            Point(snake.head.x, snake.head.y + 1),
+            Point(snake.head.x - 1, snake.head.y),
+            Point(snake.head.x + 1, snake.head.y)
+        ]
+        
+        for n in neighbors:
+            if self.grid.is_blocked(n):
+                danger_penalty += self.config.rewards.danger_sensing_penalty
+        return danger_penalty
+
+    def _calculate_reward(self, snake, dist_before, dist_after, event_type, danger_penalty=0.0):
         r = self.config.rewards
         
         if snake.reward_mode == "linear":
@@ -76,50 +130,41 @@ class GameEngine:
             if event_type == 'move':
                 change = dist_before - dist_after
                 vel_reward = change * r.dynamic_velocity_multiplier
-                
-                danger_penalty = 0.0
-                bs = self.config.block_size
-                neighbors = [
-                    Point(snake.head.x, snake.head.y - bs),
-                    Point(snake.head.x, snake.head.y + bs),
-                    Point(snake.head.x - bs, snake.head.y),
-                    Point(snake.head.x + bs, snake.head.y)
-                ]
-                
-                for n in neighbors:
-                    is_wall = (n.x < 0 or n.x >= self.config.map_width_px or 
-                               n.y < 0 or n.y >= self.config.map_height_px)
-                    is_body = False
-                    if not is_wall:
-                        for s in self.snakes:
-                            if s.is_alive and n in s.body:
-                                is_body = True
-                                break
-                    
-                    if is_wall or is_body:
-                        danger_penalty += r.danger_sensing_penalty
-
                 return vel_reward + danger_penalty + r.survival_bonus
                 
         return 0.0
 
     def step(self, actions):
+        # Расстояния до еды от текущих голов, посчитанные одним пакетом (или взятые из кэша get_state)
+        _, cached_version, _, cached_dists = self._nearest_food_all()
         self.iteration += 1
         results = []
+        # Награды за движение досчитываем пакетом в конце шага: версия еды -> (снимок еды, [(i, dist_before, danger)])
+        pending_moves = {}
+        clock = time.perf_counter if self.timer.enabled else _no_clock
+        collision_t = food_t = reward_t = 0.0
+        self.death_reasons.fill(DeathReason.ALIVE)
         
         for t_name in self.team_stats:
             self.team_stats[t_name].current_score = 0
             
         for i, snake in enumerate(self.snakes):
-            dist_before = self._get_closest_food_dist(snake)
-            snake.move(self.config.block_size)
-            snake.body.insert(0, snake.head)
+            if self.food_index.version == cached_version:
+                dist_before = cached_dists[i]
+            else:
+                dist_before = self._get_closest_food_dist(snake)
+            snake.move()
             
             reward = 0
             done = False
             
             # --- Определение причины смерти или события ---
+            # Проверяем до вставки головы: хвост ещё на месте, как и раньше
+            t0 = clock()
             death_reason = self._get_death_reason(snake)
+            cell = self.grid.at(snake.head)
+            collision_t += clock() - t0
+            snake.push_head()
             
             if death_reason != DeathReason.ALIVE:
                 # Змейка погибла от столкновения
@@ -130,6 +175,7 @@ class GameEngine:
                 
                 # Логируем аналитику
                 self.analytics.log_death(snake.team_name, death_reason)
+                self.death_reasons[i] = death_reason
                 
                 self._respawn_snake_at_random(snake)
                 
@@ -142,11 +188,13 @@ class GameEngine:
                 
                 # Логируем аналитику
                 self.analytics.log_death(snake.team_name, DeathReason.STARVATION)
+                self.death_reasons[i] = DeathReason.STARVATION
                 
                 self._respawn_snake_at_random(snake)
                 
-            elif snake.head in self.foods:
+            elif cell == Cell.FOOD:
                 # Еда
+                t0 = clock()
                 reward = self._calculate_reward(snake, 0, 0, 'food')
                 snake.score += 1
                 snake.steps_since_last_food = 0
@@ -157,44 +205,72 @@ class GameEngine:
                 if snake.score > self.team_stats[snake.team_name].record:
                     self.team_stats[snake.team_name].record = snake.score
                     
-                self.foods.remove(snake.head)
-                self._place_food()
+                self.food_index.remove(snake.head)
+                self.grid.remove_food(snake.head)
+                self.grid.occupy(snake.head, snake.id)
+                self._refill_food()
+                food_t += clock() - t0
                 
             else:
                 # Просто движение
-                dist_after = self._get_closest_food_dist(snake)
-                reward = self._calculate_reward(snake, dist_before, dist_after, 'move')
-                snake.body.pop()
+                self.grid.occupy(snake.head, snake.id)
+                t0 = clock()
+                danger = self._danger_penalty(snake) if snake.reward_mode == "dynamic" else 0.0
+                reward_t += clock() - t0
+                version = self.food_index.version
+                if version not in pending_moves:
+                    pending_moves[version] = (self.food_index.as_array(), [])
+                pending_moves[version][1].append((i, dist_before, danger))
+                self.grid.release(snake.pop_tail(), snake.id)
             
             self.team_stats[snake.team_name].current_score += snake.score
             results.append((reward, done, snake.score))
         
+        t0 = clock()
+        for foods, moves in pending_moves.values():
+            _, dists = self.food_index.nearest([self.snakes[i].head for i, _, _ in moves], foods)
+            for (i, dist_before, danger), dist_after in zip(moves, dists * self.config.block_size):
+                snake = self.snakes[i]
+                reward = self._calculate_reward(snake, dist_before, dist_after, 'move', danger)
+                results[i] = (reward, False, snake.score)
+        reward_t += clock() - t0
+        self.timer.add('collision', collision_t)
+        self.timer.add('food', food_t)
+        self.timer.add('reward', reward_t)
+        
         # Обновление аналитики (сброс буфера если пришло время)
-        self.analytics.update(self.iteration)
+        self.analytics.update(self.iteration, self.timer)
             
         return results, False
 
     def _get_closest_food_dist(self, snake):
-        if not self.foods: return 0
-        dists = [math.sqrt((snake.head.x - f.x)**2 + (snake.head.y - f.y)**2) for f in self.foods]
-        return min(dists)
+        # Расстояние в пикселях, чтобы масштаб dynamic-наград не зависел от хранения в клетках
+        _, dists = self.food_index.nearest([snake.head])
+        return dists[0] * self.config.block_size
+
+    def _nearest_food_all(self):
+        """Ближайшая еда для голов всех змеек, один пакетный запрос на итерацию и версию еды."""
+        key = (self.iteration, self.food_index.version)
+        if self._nearest_cache is None or self._nearest_cache[:2] != key:
+            points, dists = self.food_index.nearest([s.head for s in self.snakes])
+            self._nearest_cache = key + (points, dists * self.config.block_size)
+        return self._nearest_cache
 
     def _get_death_reason(self, snake) -> int:
         """Определяет, врезалась ли змея, и во что именно."""
-        h = snake.head
+        owner = self.grid.at(snake.head)
         
         # 1. Стена
-        if h.x < 0 or h.x >= self.config.map_width_px or h.y < 0 or h.y >= self.config.map_height_px: 
+        if owner == Cell.WALL: 
             return DeathReason.WALL
             
-        # 2. Самопересечение (голова в своем теле, кроме шеи - это проверяется в move, но здесь финальная проверка)
-        if h in snake.body[1:]: 
+        # 2. Самопересечение (голова еще не вставлена в тело, так что любая своя клетка - смерть)
+        if snake.head in snake.cells: 
             return DeathReason.SELF_COLLISION
             
         # 3. Враги
-        for other in self.snakes:
-            if other is not snake and h in other.body: 
-                return DeathReason.ENEMY_COLLISION
+        if owner > 0 and owner != snake.id: 
+            return DeathReason.ENEMY_COLLISION
                 
         return DeathReason.ALIVE
 
@@ -204,4 +280,6 @@ class GameEngine:
             total_time=time.time() - self.start_time, 
             total_deaths=self.total_deaths
         )
-        return GameStateDTO(self.snakes, self.foods, g_stats, self.team_stats, False)
\ No newline at end of file
+        nearest_food = self._nearest_food_all()[2]
+        timings = dict(self.timer.averages) if self.timer.enabled else None
+        return GameStateDTO(self.snakes, self.foods, g_stats, self.team_stats, False, self.grid, nearest_food, timings)
\ No newline at end of file
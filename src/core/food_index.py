@@ -0,0 +1,45 @@
+import numpy as np
+
+class FoodIndex:
+    """Список еды с номером версии и пакетным поиском ближайшей еды для многих голов.
+
+    version увеличивается при каждом изменении, по нему кэшируются результаты поиска.
+    """
+
+    def __init__(self):
+        self.points = []
+        self.version = 0
+        self._array = np.empty((0, 2), dtype=np.int64)
+        self._array_version = 0
+
+    def __len__(self):
+        return len(self.points)
+
+    def add(self, p):
+        self.points.append(p)
+        self.version += 1
+
+    def remove(self, p):
+        self.points.remove(p)
+        self.version += 1
+
+    def as_array(self):
+        if self._array_version != self.version:
+            self._array = np.array(self.points, dtype=np.int64).reshape(-1, 2)
+            self._array_version = self.version
+        return self._array
+
+    def nearest(self, heads, foods=None):
+        """Для голов (m, 2) возвращает (ближайшая еда (m, 2), евклидово расстояние в клетках (m,)).
+
+        foods - снимок as_array() более ранней версии, по умолчанию текущая еда.
+        Без еды: точка (-1, -1) и расстояние 0.
+        """
+        heads = np.asarray(heads, dtype=np.int64).reshape(-1, 2)
+        if foods is None:
+            foods = self.as_array()
+        if len(foods) == 0:
+            return np.full_like(heads, -1), np.zeros(len(heads))
+        d2 = ((heads[:, None, :] - foods[None, :, :]) ** 2).sum(axis=-1)
+        j = d2.argmin(axis=1)
+        return foods[j], np.sqrt(d2[np.arange(len(heads)), j])
@@ -0,0 +1,85 @@
+import numpy as np
+from src.core.types import Cell, Point
+
+class OccupancyGrid:
+    """Инкрементальная карта клеток: владелец (id змейки) / еда / пусто.
+
+    Параллельно ведется пул свободных клеток (массив + карта позиций, удаление обменом с последним),
+    так что случайная пустая клетка выбирается за O(1).
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        # Поле с рамкой из WALL в одну клетку: соседей головы можно читать без проверки границ
+        self._padded = np.full((width + 2, height + 2), Cell.WALL, dtype=np.int32)
+        self.cells = self._padded[1:-1, 1:-1]
+        self.cells.fill(Cell.EMPTY)
+        self._free = list(range(width * height))
+        self._free_pos = list(range(width * height))
+
+    def in_bounds(self, p):
+        return 0 <= p.x < self.width and 0 <= p.y < self.height
+
+    def at(self, p) -> int:
+        if p.x < 0 or p.x >= self.width or p.y < 0 or p.y >= self.height:
+            return Cell.WALL
+        return int(self.cells[p.x, p.y])
+
+    def is_blocked(self, p) -> bool:
+        v = self.at(p)
+        return v > 0 or v == Cell.WALL
+
+    def _set(self, x, y, value):
+        self.cells[x, y] = value
+        i = x * self.height + y
+        pos = self._free_pos[i]
+        if value == Cell.EMPTY:
+            if pos < 0:
+                self._free_pos[i] = len(self._free)
+                self._free.append(i)
+        elif pos >= 0:
+            last = self._free[-1]
+            self._free[pos] = last
+            self._free_pos[last] = pos
+            self._free.pop()
+            self._free_pos[i] = -1
+
+    def occupy(self, p, owner_id):
+        if self.in_bounds(p):
+            self._set(p.x, p.y, owner_id)
+
+    def release(self, p, owner_id):
+        # Чистим клетку, только если она всё ещё принадлежит этой змейке
+        if self.in_bounds(p) and self.cells[p.x, p.y] == owner_id:
+            self._set(p.x, p.y, Cell.EMPTY)
+
+    def blocked_cells(self, cx, cy):
+        """Векторная версия is_blocked для клеток не дальше одной клетки за краем поля."""
+        cell = self._padded[cx + 1, cy + 1]
+        return (cell > 0) | (cell == Cell.WALL)
+
+    def add_food(self, p):
+        self._set(p.x, p.y, Cell.FOOD)
+
+    def remove_food(self, p):
+        if self.cells[p.x, p.y] == Cell.FOOD:
+            self._set(p.x, p.y, Cell.EMPTY)
+
+    def random_free_cell(self, rng):
+        """Случайная пустая клетка; rng - numpy Generator владельца сетки."""
+        if not self._free:
+            return None
+        i = self._free[rng.integers(len(self._free))]
+        return Point(i // self.height, i % self.height)
+
+    def spawn_candidates(self, length, margin):
+        """Все головы в окне [margin, size - 1 - margin], для которых свободно тело (x - i, y), i < length."""
+        free = self.cells == Cell.EMPTY
+        ok = free.copy()
+        for i in range(1, length):
+            ok[i:, :] &= free[:-i, :]
+            ok[:i, :] = False
+        window = np.zeros_like(ok)
+        window[margin:self.width - margin, margin:self.height - margin] = True
+        return np.argwhere(ok & window)
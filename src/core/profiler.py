@@ -0,0 +1,102 @@
+import os
+import time
+import cProfile
+import pstats
+import tracemalloc
+
+# Фазы тика: цикл main.py и части GameEngine.step (они входят во время фазы step)
+LOOP_PHASES = ('sense', 'act', 'step', 'learn', 'render')
+ENGINE_PHASES = ('collision', 'food', 'reward')
+PHASES = LOOP_PHASES + ENGINE_PHASES
+
+class PhaseTimer:
+    """Лёгкие таймеры фаз тика на perf_counter.
+
+    lap(phase) относит к фазе время с прошлой отметки, add(phase, seconds) - уже измеренное время.
+    end_tick() закрывает тик: averages - скользящее среднее в мс за тик для сайдбара,
+    interval_means() - среднее за интервал аналитики.
+    """
+
+    def __init__(self, enabled=True, smoothing=0.05):
+        self.enabled = enabled
+        self.smoothing = smoothing
+        self.averages = dict.fromkeys(PHASES, 0.0)
+        self._tick = dict.fromkeys(PHASES, 0.0)
+        self._interval = dict.fromkeys(PHASES, 0.0)
+        self._interval_ticks = 0
+        self._mark = time.perf_counter()
+
+    def mark(self):
+        self._mark = time.perf_counter()
+
+    def lap(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._tick[phase] += now - self._mark
+        self._mark = now
+
+    def add(self, phase, seconds):
+        if self.enabled:
+            self._tick[phase] += seconds
+
+    def end_tick(self):
+        if not self.enabled:
+            return
+        a = self.smoothing
+        for phase, seconds in self._tick.items():
+            ms = seconds * 1e3
+            self.averages[phase] += a * (ms - self.averages[phase])
+            self._interval[phase] += ms
+            self._tick[phase] = 0.0
+        self._interval_ticks += 1
+
+    def interval_means(self):
+        """Средние мс за тик с прошлого вызова; None, если end_tick с тех пор не вызывался.
+
+        Тики закрывает цикл, который размечает фазы (main.py); без него нулевые средние только вводили бы в заблуждение.
+        """
+        if self._interval_ticks == 0:
+            return None
+        ticks = self._interval_ticks
+        means = {phase: total / ticks for phase, total in self._interval.items()}
+        self._interval = dict.fromkeys(PHASES, 0.0)
+        self._interval_ticks = 0
+        return means
+
+
+class ProfileWindow:
+    """cProfile и tracemalloc на окне итераций [start, end): итоги сохраняются в out_dir."""
+
+    def __init__(self, start, end, out_dir="profiles"):
+        self.start = start
+        self.end = end
+        self.out_dir = out_dir
+        self._profiler = None
+
+    def update(self, iteration):
+        if iteration == self.start and self._profiler is None:
+            tracemalloc.start(10)
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif iteration >= self.end and self._profiler is not None:
+            self.close()
+
+    def close(self):
+        if self._profiler is None:
+            return
+        self._profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"iter_{self.start}_{self.end}")
+        self._profiler.dump_stats(base + ".prof")
+        with open(base + ".txt", "w") as f:
+            f.write(f"cProfile, iterations {self.start}-{self.end}, by cumulative time\n")
+            pstats.Stats(self._profiler, stream=f).sort_stats("cumulative").print_stats(40)
+            f.write("tracemalloc, top allocations by line\n")
+            for stat in snapshot.statistics("lineno")[:30]:
+                f.write(f"{stat}\n")
+        self._profiler = None
+        print(f"--- Profile saved: {base}.prof, {base}.txt ---")
@@ -1,13 +1,22 @@
+from collections import deque
 from src.core.types import Direction, Point
 
 class Snake:
-    def __init__(self, x, y, team_config, initial_length=3, block_size=20):
+    """Змейка в координатах клеток: тело - deque от головы к хвосту, cells - множество тех же клеток."""
+
+    __slots__ = (
+        'head', 'body', 'cells', 'direction', 'id', 'team_name', 'color', 'is_alive',
+        'score', 'steps_alive', 'steps_since_last_food', 'deaths', 'brain_type', 'reward_mode',
+        'last_score', 'last_steps_alive'
+    )
+
+    def __init__(self, x, y, team_config, initial_length=3):
         self.head = Point(x, y)
-        self.body = []
-        for i in range(initial_length):
-            self.body.append(Point(x - (i * block_size), y))
-            
+        self.body = deque(Point(x - i, y) for i in range(initial_length))
+        self.cells = set(self.body)
+
         self.direction = Direction.RIGHT
+        self.id = 0
         self.team_name = team_config.name
         self.color = team_config.color
         self.is_alive = True
@@ -17,6 +26,9 @@ class Snake:
         self.deaths = 0
         self.brain_type = team_config.brain_type
         self.reward_mode = team_config.reward_mode
+        # Итоги прошлой жизни: движок респаунит змейку внутри step
+        self.last_score = 0
+        self.last_steps_alive = 0
 
     def set_direction(self, direction):
         if not self.is_alive: return
@@ -27,13 +39,34 @@ class Snake:
             return
         self.direction = direction
 
-    def move(self, block_size):
+    def move(self):
         if not self.is_alive: return
         x, y = self.head.x, self.head.y
-        if self.direction == Direction.RIGHT: x += block_size
-        elif self.direction == Direction.LEFT: x -= block_size
-        elif self.direction == Direction.DOWN: y += block_size
-        elif self.direction == Direction.UP: y -= block_size
+        if self.direction == Direction.RIGHT: x += 1
+        elif self.direction == Direction.LEFT: x -= 1
+        elif self.direction == Direction.DOWN: y += 1
+        elif self.direction == Direction.UP: y -= 1
         self.head = Point(x, y)
         self.steps_alive += 1
-        self.steps_since_last_food += 1
\ No newline at end of file
+        self.steps_since_last_food += 1
+
+    def push_head(self):
+        self.body.appendleft(self.head)
+        self.cells.add(self.head)
+
+    def pop_tail(self):
+        tail = self.body.pop()
+        self.cells.discard(tail)
+        return tail
+
+    def reset(self, body, direction):
+        self.last_score = self.score
+        self.last_steps_alive = self.steps_alive
+        self.body = deque(body)
+        self.cells = set(self.body)
+        self.head = self.body[0]
+        self.direction = direction
+        self.is_alive = True
+        self.score = 0
+        self.steps_alive = 0
+        self.steps_since_last_food = 0
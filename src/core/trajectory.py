@@ -0,0 +1,103 @@
+import json
+import numpy as np
+
+# Одна запись - один переход одной змейки; поля фиксированной ширины, без выравнивания.
+# Сенсоры - 11 бинарных флагов, поэтому хранятся как uint8 без потерь.
+RECORD_DTYPE = np.dtype([
+    ('iteration', '<u4'),
+    ('snake', '<u2'),
+    ('team', 'u1'),
+    ('action', 'u1'),
+    ('death_reason', 'u1'),
+    ('done', 'u1'),
+    ('reward', '<f4'),
+    ('state', 'u1', (11,)),
+    ('next_state', 'u1', (11,)),
+])
+
+# Заголовок .npy фиксированного размера: число записей переписывается на месте при каждом сбросе
+HEADER_SIZE = 512
+
+def _npy_header(count, dtype=RECORD_DTYPE):
+    header = repr({
+        'descr': np.lib.format.dtype_to_descr(dtype),
+        'fortran_order': False,
+        'shape': (count,),
+    })
+    prefix = np.lib.format.magic(1, 0)
+    body_len = HEADER_SIZE - len(prefix) - 2
+    if len(header) + 1 > body_len:
+        raise ValueError("Trajectory header does not fit, increase HEADER_SIZE")
+    header = header.ljust(body_len - 1) + '\n'
+    return prefix + body_len.to_bytes(2, 'little') + header.encode('latin1')
+
+
+class TrajectoryWriter:
+    """Запись переходов в файл .npy из записей RECORD_DTYPE, дописываемый большими порциями.
+
+    Файл читается через np.load(path, mmap_mode='r') (или open_trajectory) без разбора;
+    рядом лежит path + '.json' с именами команд и сенсоров.
+    """
+
+    def __init__(self, path, team_names, chunk_size=65536, meta=None):
+        self.path = path
+        self.count = 0
+        self._buffer = np.zeros(chunk_size, dtype=RECORD_DTYPE)
+        self._fill = 0
+        self._file = open(path, 'wb')
+        self._file.write(_npy_header(0))
+        with open(path + '.json', 'w') as f:
+            json.dump({'teams': list(team_names), 'record_size': RECORD_DTYPE.itemsize, **(meta or {})}, f, indent=2)
+
+    def append(self, iteration, states, actions, rewards, next_states, dones, death_reasons, teams, snakes=None):
+        """Переходы одного тика: по строке на змейку, массивы одинаковой длины."""
+        n = len(actions)
+        start = 0
+        while start < n:
+            take = min(n - start, len(self._buffer) - self._fill)
+            rows = self._buffer[self._fill:self._fill + take]
+            part = slice(start, start + take)
+            rows['iteration'] = iteration
+            rows['snake'] = np.arange(start, start + take) if snakes is None else snakes[part]
+            rows['team'] = teams[part]
+            rows['action'] = actions[part]
+            rows['death_reason'] = death_reasons[part]
+            rows['done'] = dones[part]
+            rows['reward'] = rewards[part]
+            rows['state'] = states[part]
+            rows['next_state'] = next_states[part]
+            self._fill += take
+            start += take
+            if self._fill == len(self._buffer):
+                self.flush()
+
+    def flush(self):
+        if self._fill:
+            self._file.write(self._buffer[:self._fill].tobytes())
+            self.count += self._fill
+            self._fill = 0
+        # Число записей в заголовке, чтобы уже записанную часть можно было читать
+        self._file.seek(0)
+        self._file.write(_npy_header(self.count))
+        self._file.seek(0, 2)
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_trajectory(path):
+    """(memmap записей RECORD_DTYPE, метаданные из path + '.json')."""
+    records = np.load(path, mmap_mode='r')
+    with open(path + '.json') as f:
+        meta = json.load(f)
+    return records, meta
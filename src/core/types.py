@@ -1,6 +1,7 @@
+import numpy as np
 from collections import namedtuple
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Any
 
 Point = namedtuple('Point', 'x, y')
 
@@ -10,6 +11,16 @@ class Direction:
     DOWN = 3
     LEFT = 4
 
+# Направления по часовой стрелке (RIGHT, DOWN, LEFT, UP) и шаг головы по каждому из них
+CLOCK_WISE = np.array([Direction.RIGHT, Direction.DOWN, Direction.LEFT, Direction.UP], dtype=np.int8)
+DX = np.array([1, 0, -1, 0], dtype=np.int32)
+DY = np.array([0, 1, 0, -1], dtype=np.int32)
+
+class Cell:
+    EMPTY = 0
+    FOOD = -1
+    WALL = -2
+
 class DeathReason:
     ALIVE = 0
     WALL = 1
@@ -36,4 +47,7 @@ class GameStateDTO:
     foods: List[Point]
     global_stats: GlobalStats
     team_stats: Dict[str, TeamStats]
-    is_game_over: bool
\ No newline at end of file
+    is_game_over: bool
+    grid: Any = None
+    nearest_food: Any = None
+    timings: Any = None
\ No newline at end of file
@@ -0,0 +1,291 @@
+import numpy as np
+from src.core.types import Direction, DeathReason, Cell, TeamStats, CLOCK_WISE, DX, DY
+from src.core.analytics import AnalyticsEngine
+
+class VecGameEngine:
+    """N независимых арен в массивах NumPy, шаг всех арен одним вызовом step(actions).
+
+    Каждая арена содержит те же слоты змеек, что и GameEngine (команды из config.teams).
+    Координаты хранятся в клетках, действия относительные: 0 - прямо, 1 - направо, 2 - налево.
+    """
+
+    def __init__(self, config, num_envs, seed=None):
+        self.config = config
+        self.num_envs = num_envs
+        self.rng = np.random.default_rng(seed)
+        self.iteration = 0
+        self.total_deaths = 0
+
+        slot_team = []
+        for t_idx, team in enumerate(config.teams):
+            slot_team += [t_idx] * team.count
+        self.slot_team = np.array(slot_team, dtype=np.int32)
+        self.num_snakes = len(slot_team)
+        self.dynamic = np.array([config.teams[t].reward_mode == "dynamic" for t in slot_team])
+
+        W, H = config.grid_width, config.grid_height
+        N, S = num_envs, self.num_snakes
+        self.capacity = W * H
+
+        self.grid = np.zeros((N, W, H), dtype=np.int32)
+        # Кольцевой буфер тела: body[n, s, head_ptr] - голова, хвост на length-1 позиций назад
+        self.body = np.zeros((N, S, self.capacity, 2), dtype=np.int16)
+        self.head_ptr = np.zeros((N, S), dtype=np.int32)
+        self.length = np.zeros((N, S), dtype=np.int32)
+        self.heads = np.zeros((N, S, 2), dtype=np.int32)
+        self.dir_idx = np.zeros((N, S), dtype=np.int8)
+        self.score = np.zeros((N, S), dtype=np.int32)
+        self.steps_alive = np.zeros((N, S), dtype=np.int32)
+        self.hunger = np.zeros((N, S), dtype=np.int32)
+        self.foods = np.full((N, config.food_count, 2), -1, dtype=np.int32)
+        self.death_reasons = np.zeros((N, S), dtype=np.int8)
+
+        self.team_stats = {t.name: TeamStats() for t in config.teams}
+        self.analytics = AnalyticsEngine(config)
+
+        window = np.zeros((W, H), dtype=bool)
+        window[2:W - 2, 2:H - 2] = True
+        self._spawn_window = window
+
+        self.reset()
+
+    def reset(self):
+        all_idx = np.arange(self.num_envs)
+        self.grid.fill(Cell.EMPTY)
+        self.foods.fill(-1)
+        for k in range(self.num_snakes):
+            self._spawn(all_idx, k, random_dir=False)
+        for f in range(self.config.food_count):
+            self._place_food(all_idx, f)
+
+    def _spawn(self, idx, k, random_dir=True):
+        m = len(idx)
+        if m == 0: return
+        W, H = self.config.grid_width, self.config.grid_height
+        L = self.config.initial_snake_length
+
+        g = self.grid[idx]
+        g[g == k + 1] = Cell.EMPTY
+        free = g == Cell.EMPTY
+        # ok[n][e, x, y]: свободны все клетки (x - i, y) тела длины n
+        ok = {1: free}
+        for n in range(2, L + 1):
+            ok[n] = ok[n - 1].copy()
+            ok[n][:, n - 1:, :] &= free[:, :-(n - 1), :]
+            ok[n][:, :n - 1, :] = False
+
+        # Сначала полное тело в окне; на переполненной доске - без отступа и всё более короткое тело.
+        # Поверх еды и чужих змеек не ставим никогда
+        noise = self.rng.random(g.shape)
+        lengths = np.zeros(m, dtype=np.int32)
+        flat = np.zeros(m, dtype=np.int64)
+        pending = np.ones(m, dtype=bool)
+        for n, window in [(L, self._spawn_window)] + [(n, None) for n in range(L, 0, -1)]:
+            cand = ok[n] if window is None else ok[n] & window
+            found = pending & cand.reshape(m, -1).any(axis=1)
+            if found.any():
+                scores = np.where(cand[found], noise[found], -1.0)
+                flat[found] = scores.reshape(int(found.sum()), -1).argmax(axis=1)
+                lengths[found] = n
+                pending &= ~found
+            if not pending.any():
+                break
+        if pending.any():
+            raise ValueError("No free cell to place a snake, the grid is too small")
+        hx, hy = np.divmod(flat, H)
+
+        rows = np.arange(m)
+        for i in range(L):
+            # i-я клетка от хвоста есть только у тел длиннее i
+            has = i < lengths
+            x = hx[has] - (lengths[has] - 1 - i)
+            self.body[idx[has], k, i, 0] = x
+            self.body[idx[has], k, i, 1] = hy[has]
+            g[rows[has], x, hy[has]] = k + 1
+        self.grid[idx] = g
+
+        self.head_ptr[idx, k] = lengths - 1
+        self.length[idx, k] = lengths
+        self.heads[idx, k, 0] = hx
+        self.heads[idx, k, 1] = hy
+        self.dir_idx[idx, k] = self.rng.integers(0, 4, size=m) if random_dir else 0
+        self.score[idx, k] = 0
+        self.steps_alive[idx, k] = 0
+        self.hunger[idx, k] = 0
+
+    def _place_food(self, idx, f):
+        m = len(idx)
+        if m == 0: return
+        g = self.grid[idx]
+        scores = self.rng.random(g.shape)
+        scores[g != Cell.EMPTY] = -1
+        flat_scores = scores.reshape(m, -1)
+        flat = flat_scores.argmax(axis=1)
+        has = flat_scores[np.arange(m), flat] >= 0
+        x, y = np.divmod(flat, self.config.grid_height)
+
+        sel = idx[has]
+        self.foods[sel, f, 0] = x[has]
+        self.foods[sel, f, 1] = y[has]
+        self.grid[sel, x[has], y[has]] = Cell.FOOD
+        self.foods[idx[~has], f] = -1
+
+    def _closest_food(self, idx, heads):
+        """Ближайшая еда для голов heads (m, 2): (точки еды, расстояния в пикселях)."""
+        foods = self.foods[idx]
+        d2 = ((foods - heads[:, None, :]) ** 2).sum(axis=-1).astype(np.float64)
+        d2[foods[..., 0] < 0] = np.inf
+        j = d2.argmin(axis=1)
+        best = d2[np.arange(len(idx)), j]
+        has = np.isfinite(best)
+        points = np.where(has[:, None], foods[np.arange(len(idx)), j], -1)
+        dists = np.where(has, np.sqrt(np.where(has, best, 0.0)), 0.0) * self.config.block_size
+        return points, dists
+
+    def _is_blocked(self, idx, x, y):
+        W, H = self.config.grid_width, self.config.grid_height
+        wall = (x < 0) | (x >= W) | (y < 0) | (y >= H)
+        cell = self.grid[idx, np.clip(x, 0, W - 1), np.clip(y, 0, H - 1)]
+        return wall | (cell > 0)
+
+    def step(self, actions):
+        N, S = self.num_envs, self.num_snakes
+        W, H = self.config.grid_width, self.config.grid_height
+        r = self.config.rewards
+        actions = np.asarray(actions).reshape(N, S)
+        all_idx = np.arange(N)
+
+        self.iteration += 1
+        rewards = np.zeros((N, S), dtype=np.float32)
+        dones = np.zeros((N, S), dtype=bool)
+        self.death_reasons.fill(DeathReason.ALIVE)
+
+        for k in range(S):
+            team = self.config.teams[self.slot_team[k]]
+            t_stats = self.team_stats[team.name]
+            dynamic = self.dynamic[k]
+
+            _, dist_before = self._closest_food(all_idx, self.heads[:, k])
+
+            a = actions[:, k]
+            turn = np.where(a == 0, 0, np.where(a == 1, 1, -1))
+            d = (self.dir_idx[:, k] + turn) % 4
+            self.dir_idx[:, k] = d
+            nx = self.heads[:, k, 0] + DX[d]
+            ny = self.heads[:, k, 1] + DY[d]
+            self.steps_alive[:, k] += 1
+            self.hunger[:, k] += 1
+
+            # --- Определение причины смерти или события ---
+            wall = (nx < 0) | (nx >= W) | (ny < 0) | (ny >= H)
+            cell = np.where(wall, Cell.WALL, self.grid[all_idx, np.clip(nx, 0, W - 1), np.clip(ny, 0, H - 1)])
+
+            reason = np.full(N, DeathReason.ALIVE, dtype=np.int8)
+            reason[cell > 0] = DeathReason.ENEMY_COLLISION
+            reason[cell == k + 1] = DeathReason.SELF_COLLISION
+            reason[wall] = DeathReason.WALL
+            collided = reason != DeathReason.ALIVE
+            starved = ~collided & (self.hunger[:, k] >= self.config.max_steps_without_food)
+            reason[starved] = DeathReason.STARVATION
+            ate = ~collided & ~starved & (cell == Cell.FOOD)
+            moved = ~collided & ~starved & ~ate
+
+            if dynamic:
+                rewards[collided, k] = -10.0 - (self.length[collided, k] + 1) * 0.5
+                rewards[ate, k] = 25.0
+            else:
+                rewards[collided, k] = r.death_penalty_base
+                rewards[ate, k] = r.food_reward_base
+            rewards[starved, k] = r.starvation_penalty
+
+            # Вставка головы для выживших
+            alive = ate | moved
+            ai = all_idx[alive]
+            p = (self.head_ptr[ai, k] + 1) % self.capacity
+            self.body[ai, k, p, 0] = nx[alive]
+            self.body[ai, k, p, 1] = ny[alive]
+            self.head_ptr[ai, k] = p
+            self.length[ai, k] += 1
+            self.grid[ai, nx[alive], ny[alive]] = k + 1
+            self.heads[ai, k, 0] = nx[alive]
+            self.heads[ai, k, 1] = ny[alive]
+
+            # Еда
+            ei = all_idx[ate]
+            if len(ei):
+                self.score[ei, k] += 1
+                self.hunger[ei, k] = 0
+                eaten = np.all(self.foods[ei] == self.heads[ei, k][:, None, :], axis=-1).argmax(axis=1)
+                for f in np.unique(eaten):
+                    self._place_food(ei[eaten == f], f)
+                t_stats.record = max(t_stats.record, int(self.score[ei, k].max()))
+                self.analytics.log_food(team.name, len(ei))
+
+            # Просто движение
+            mi = all_idx[moved]
+            if len(mi):
+                heads = self.heads[mi, k]
+                _, dist_after = self._closest_food(mi, heads)
+                if dynamic:
+                    danger = np.zeros(len(mi), dtype=np.float32)
+                    for j in range(4):
+                        danger += self._is_blocked(mi, heads[:, 0] + DX[j], heads[:, 1] + DY[j])
+                    rewards[mi, k] = ((dist_before[mi] - dist_after) * r.dynamic_velocity_multiplier
+                                      + danger * r.danger_sensing_penalty + r.survival_bonus)
+                else:
+                    rewards[mi, k] = np.where(dist_after < dist_before[mi], r.step_closer, r.step_farther)
+
+                tail_ptr = (self.head_ptr[mi, k] - self.length[mi, k] + 1) % self.capacity
+                tx = self.body[mi, k, tail_ptr, 0]
+                ty = self.body[mi, k, tail_ptr, 1]
+                owned = self.grid[mi, tx, ty] == k + 1
+                self.grid[mi[owned], tx[owned], ty[owned]] = Cell.EMPTY
+                self.length[mi, k] -= 1
+
+            # Смерть: автоматический респаун в той же арене
+            dead = collided | starved
+            di = all_idx[dead]
+            if len(di):
+                dones[di, k] = True
+                self.death_reasons[di, k] = reason[dead]
+                self.total_deaths += len(di)
+                t_stats.deaths += len(di)
+                counts = np.bincount(reason[dead], minlength=DeathReason.STARVATION + 1)
+                for cause in (DeathReason.WALL, DeathReason.SELF_COLLISION,
+                              DeathReason.ENEMY_COLLISION, DeathReason.STARVATION):
+                    if counts[cause]:
+                        self.analytics.log_death(team.name, cause, int(counts[cause]))
+                self._spawn(di, k)
+
+        for t_idx, team in enumerate(self.config.teams):
+            self.team_stats[team.name].current_score = int(self.score[:, self.slot_team == t_idx].sum())
+
+        self.analytics.update(self.iteration)
+
+        return rewards, dones, self.score.copy()
+
+    def get_sensors(self):
+        """Признаки в формате MultiAgentStrategy._get_sensors для всех змеек: (N, S, 11) float32."""
+        N, S = self.num_envs, self.num_snakes
+        idx = np.repeat(np.arange(N), S)
+        heads = self.heads.reshape(-1, 2)
+        d = self.dir_idx.reshape(-1).astype(np.int32)
+
+        out = np.zeros((N * S, 11), dtype=np.float32)
+        # Опасность прямо / справа / слева относительно текущего направления
+        for col, turn in enumerate((0, 1, -1)):
+            nd = (d + turn) % 4
+            out[:, col] = self._is_blocked(idx, heads[:, 0] + DX[nd], heads[:, 1] + DY[nd])
+
+        dirs = CLOCK_WISE[d]
+        out[:, 3] = dirs == Direction.LEFT
+        out[:, 4] = dirs == Direction.RIGHT
+        out[:, 5] = dirs == Direction.UP
+        out[:, 6] = dirs == Direction.DOWN
+
+        food, _ = self._closest_food(idx, heads)
+        out[:, 7] = food[:, 0] < heads[:, 0]
+        out[:, 8] = food[:, 0] > heads[:, 0]
+        out[:, 9] = food[:, 1] < heads[:, 1]
+        out[:, 10] = food[:, 1] > heads[:, 1]
+        return out.reshape(N, S, 11)
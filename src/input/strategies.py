@@ -1,13 +1,34 @@
-import torch
 import numpy as np
-from src.core.types import Direction, Point
+from src.ai.numpy_net import NumpySnakeNet
+from src.core.types import Direction, Point, DX, DY
+
+# Direction -> индекс в порядке по часовой стрелке (RIGHT, DOWN, LEFT, UP)
+CLOCK_INDEX = np.array([0, 3, 0, 1, 2], dtype=np.int32)
+# Индекс направления -> сдвиги до клеток прямо / справа / слева
+_AHEAD = (np.arange(4)[:, None] + np.array([0, 1, -1])) % 4
+AHEAD_DX = DX[_AHEAD]
+AHEAD_DY = DY[_AHEAD]
+# Direction -> признаки LEFT, RIGHT, UP, DOWN
+DIR_FLAGS = np.zeros((5, 4), dtype=np.float32)
+for _col, _dir in enumerate((Direction.LEFT, Direction.RIGHT, Direction.UP, Direction.DOWN)):
+    DIR_FLAGS[_dir, _col] = 1.0
+# Меньше змеек векторный путь не окупает накладных расходов NumPy (см. sensors.* в bench_suite)
+BATCH_MIN_SNAKES = 3
 
 class MultiAgentStrategy:
-    def __init__(self, config):
+    def __init__(self, config, seed=None):
         self.config = config
+        # Генератор для epsilon-исследования
+        self.rng = np.random.default_rng(seed)
+
+    def get_action(self, model, snake, state_dto, sensors=None):
+        if sensors is None:
+            sensors = self._get_sensors(snake, state_dto)
+        if isinstance(model, NumpySnakeNet):
+            action_idx = int(model.act(sensors))
+            return self._transform_action(snake, action_idx), action_idx, sensors
 
-    def get_action(self, model, snake, state_dto):
-        sensors = self._get_sensors(snake, state_dto)
+        import torch
         state_tensor = torch.tensor(sensors, dtype=torch.float).unsqueeze(0)
         
         with torch.no_grad():
@@ -17,13 +38,66 @@ class MultiAgentStrategy:
         move = self._transform_action(snake, action_idx)
         return move, action_idx, sensors
 
+    def get_actions_batch(self, models, sensors, epsilons=None):
+        """Индексы действий для всех змеек: один forward на каждую уникальную модель.
+
+        models[i] - модель i-й змейки, NumpySnakeNet или PopulationMember особи GA (такие особи
+        одной популяции считаются одним batched matmul), sensors - матрица (num_snakes, 11),
+        epsilons - вероятность случайного действия для каждой змейки.
+        """
+        n = len(models)
+        actions = np.zeros(n, dtype=np.int64)
+        greedy = np.ones(n, dtype=bool)
+        if epsilons is not None:
+            explore = self.rng.random(n) < np.asarray(epsilons)
+            actions[explore] = self.rng.integers(0, 3, size=int(explore.sum()))
+            greedy = ~explore
+
+        numpy_groups = {}
+        torch_rows = []
+        for i in np.flatnonzero(greedy):
+            m = models[i]
+            if isinstance(m, NumpySnakeNet):
+                numpy_groups.setdefault(id(m), (m, []))[1].append(i)
+            else:
+                torch_rows.append(i)
+        for model, idx in numpy_groups.values():
+            actions[idx] = model.act(sensors[idx])
+        if torch_rows:
+            self._torch_actions(models, sensors, torch_rows, actions)
+        return actions
+
+    def _torch_actions(self, models, sensors, rows, actions):
+        """Действия моделей torch и особей GA; torch импортируется только здесь, вывод на NumPy его не грузит."""
+        import torch
+        from src.ai.ga_trainer import PopulationMember
+        from src.ai.model import population_forward
+
+        groups = {}
+        populations = {}
+        for i in rows:
+            m = models[i]
+            if isinstance(m, PopulationMember):
+                populations.setdefault(id(m.weights), (m.weights, [], []))
+                populations[id(m.weights)][1].append(i)
+                populations[id(m.weights)][2].append(m.idx)
+            else:
+                groups.setdefault(id(m), (m, []))[1].append(i)
+
+        x = torch.from_numpy(np.ascontiguousarray(sensors, dtype=np.float32))
+        with torch.no_grad():
+            for model, idx in groups.values():
+                actions[idx] = model(x[idx]).argmax(dim=1).numpy()
+            for weights, idx, members in populations.values():
+                actions[idx] = population_forward(weights, members, x[idx]).argmax(dim=1).numpy()
+
     def _get_sensors(self, snake, state_dto):
         head = snake.head
         
-        point_l = Point(head.x - 20, head.y)
-        point_r = Point(head.x + 20, head.y)
-        point_u = Point(head.x, head.y - 20)
-        point_d = Point(head.x, head.y + 20)
+        point_l = Point(head.x - 1, head.y)
+        point_r = Point(head.x + 1, head.y)
+        point_u = Point(head.x, head.y - 1)
+        point_d = Point(head.x, head.y + 1)
 
         dir_l = snake.direction == Direction.LEFT
         dir_r = snake.direction == Direction.RIGHT
@@ -60,20 +134,41 @@ class MultiAgentStrategy:
         
         return np.array(state, dtype=float)
 
+    def get_sensors_batch(self, state_dto):
+        """Признаки всех змеек одной матрицей (num_snakes, 11) по сетке занятости."""
+        snakes = state_dto.snakes
+        if len(snakes) < BATCH_MIN_SNAKES:
+            return np.array([self._get_sensors(s, state_dto) for s in snakes], dtype=np.float32).reshape(-1, 11)
+        heads = np.array([s.head for s in snakes], dtype=np.int64).reshape(-1, 2)
+        dirs = np.array([s.direction for s in snakes], dtype=np.int32)
+        d = CLOCK_INDEX[dirs]
+
+        out = np.empty((len(snakes), 11), dtype=np.float32)
+        # Опасность прямо / справа / слева - одним обращением к сетке
+        out[:, :3] = state_dto.grid.blocked_cells(heads[:, :1] + AHEAD_DX[d], heads[:, 1:] + AHEAD_DY[d])
+        out[:, 3:7] = DIR_FLAGS[dirs]
+
+        if state_dto.nearest_food is not None:
+            # Движок уже нашел ближайшую еду для всех голов на этом шаге
+            food = state_dto.nearest_food
+        elif state_dto.foods:
+            foods = np.array(state_dto.foods, dtype=np.int64)
+            d2 = ((heads[:, None, :] - foods[None, :, :]) ** 2).sum(axis=-1)
+            food = foods[d2.argmin(axis=1)]
+        else:
+            food = np.full_like(heads, -1)
+        # Колонки 7..10: еда левее, правее, выше, ниже головы
+        out[:, 7::2] = food < heads
+        out[:, 8::2] = food > heads
+        return out
+
     def _get_closest_food(self, snake, foods):
         if not foods: return Point(-1, -1)
         closest = min(foods, key=lambda f: (snake.head.x - f.x)**2 + (snake.head.y - f.y)**2)
         return closest
 
     def _is_collision(self, pt, state):
-        if pt.x < 0 or pt.x >= self.config.map_width_px or \
-           pt.y < 0 or pt.y >= self.config.map_height_px:
-            return True
-        
-        for s in state.snakes:
-            if s.is_alive and pt in s.body:
-                return True
-        return False
+        return state.grid.is_blocked(pt)
 
     def _transform_action(self, snake, action_idx):
         clock_wise = [Direction.RIGHT, Direction.DOWN, Direction.LEFT, Direction.UP]
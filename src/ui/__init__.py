@@ -1,5 +1,15 @@
-from .pygame_ui import PygameRenderer
+from .viewer import ViewerProcess, open_plotter, make_snapshot
 
 __all__ = [
-    "PygameRenderer"
-]
\ No newline at end of file
+    "PygameRenderer",
+    "ViewerProcess",
+    "open_plotter",
+    "make_snapshot"
+]
+
+def __getattr__(name):
+    # pygame импортируется только там, где действительно рисуем
+    if name == "PygameRenderer":
+        from .pygame_ui import PygameRenderer
+        return PygameRenderer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
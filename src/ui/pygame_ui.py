@@ -10,50 +10,103 @@ class PygameRenderer:
         self.display = pygame.display.set_mode((config.window_width, config.window_height))
         pygame.display.set_caption('Multi-Brain Snake AI')
         self.clock = pygame.time.Clock()
+        
+        self.map_layer = self._build_map_layer()
+        self.sidebar_rect = pygame.Rect(config.map_width_px + 2, 0, config.sidebar_width - 2, config.window_height)
+        self._text_cache = {}
+        # Клетка (x, y) -> (цвет, рамка), нарисованные в прошлом кадре; в пиксели переводим только при рисовании
+        self._drawn_cells = {}
+        self._full_redraw = True
 
     def render(self, state):
-        self.display.fill(self.config.colors.BACKGROUND)
-        self._draw_grid()
-        self._draw_world(state)
-        self._draw_sidebar(state)
-        pygame.display.flip()
+        cells = self._collect_cells(state)
+        
+        if self._full_redraw:
+            self.display.fill(self.config.colors.BACKGROUND)
+            self.display.blit(self.map_layer, (0, 0))
+            for pos, spec in cells.items():
+                self._draw_cell(pos, spec)
+            self._draw_sidebar(state)
+            pygame.display.flip()
+            self._full_redraw = False
+        else:
+            # Перерисовываем только изменившиеся клетки: новые головы, ушедшие хвосты, еду
+            dirty = []
+            prev = self._drawn_cells
+            for pos in prev.keys() - cells.keys():
+                dirty.append(self._clear_cell(pos))
+            for pos, spec in cells.items():
+                if prev.get(pos) != spec:
+                    dirty.append(self._draw_cell(pos, spec))
+            self._draw_sidebar(state)
+            dirty.append(self.sidebar_rect)
+            pygame.display.update(dirty)
+            
+        self._drawn_cells = cells
 
-    def _draw_grid(self):
+    def _build_map_layer(self):
+        layer = pygame.Surface((self.config.map_width_px + 2, self.config.map_height_px))
+        layer.fill(self.config.colors.BACKGROUND)
         for x in range(0, self.config.map_width_px + 1, self.config.block_size):
-            pygame.draw.line(self.display, self.config.colors.GRID, (x, 0), (x, self.config.map_height_px))
+            pygame.draw.line(layer, self.config.colors.GRID, (x, 0), (x, self.config.map_height_px))
         for y in range(0, self.config.map_height_px + 1, self.config.block_size):
-            pygame.draw.line(self.display, self.config.colors.GRID, (0, y), (self.config.map_width_px, y))
-        pygame.draw.line(self.display, (0,0,0), (self.config.map_width_px, 0), (self.config.map_width_px, self.config.map_height_px), 2)
+            pygame.draw.line(layer, self.config.colors.GRID, (0, y), (self.config.map_width_px, y))
+        pygame.draw.line(layer, (0,0,0), (self.config.map_width_px, 0), (self.config.map_width_px, self.config.map_height_px), 2)
+        return layer
 
-    def _draw_world(self, state):
-        for food in state.foods:
-            rect = (food.x, food.y, self.config.block_size, self.config.block_size)
-            pygame.draw.rect(self.display, self.config.colors.FOOD, rect)
+    def _collect_cells(self, state):
+        cells = {}
+        for fx, fy in state.foods:
+            cells[(fx, fy)] = (self.config.colors.FOOD, False)
             
         for snake in state.snakes:
             if not snake.is_alive: continue
-            for i, pt in enumerate(snake.body):
-                rect = (pt.x, pt.y, self.config.block_size, self.config.block_size)
-                color = snake.color
-                if i == 0: 
-                    color = (max(0, color[0]-50), max(0, color[1]-50), max(0, color[2]-50))
-                pygame.draw.rect(self.display, color, rect)
-                pygame.draw.rect(self.display, (50,50,50), rect, 1)
+            color = snake.color
+            head_color = (max(0, color[0]-50), max(0, color[1]-50), max(0, color[2]-50))
+            for i, (x, y) in enumerate(snake.body):
+                cells[(x, y)] = (head_color if i == 0 else color, True)
+        return cells
+
+    def _cell_rect(self, pos):
+        bs = self.config.block_size
+        return pygame.Rect(pos[0] * bs, pos[1] * bs, bs, bs)
+
+    def _clear_cell(self, pos):
+        rect = self._cell_rect(pos)
+        self.display.blit(self.map_layer, rect, rect)
+        return rect
+
+    def _draw_cell(self, pos, spec):
+        rect = self._cell_rect(pos)
+        color, border = spec
+        pygame.draw.rect(self.display, color, rect)
+        if border:
+            pygame.draw.rect(self.display, (50,50,50), rect, 1)
+        return rect
+
+    def _text(self, text, color, bold=False):
+        key = (text, color, bold)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) > 2000:
+                self._text_cache.clear()
+            font = self.font_bold if bold else self.font
+            surface = font.render(text, True, color)
+            self._text_cache[key] = surface
+        return surface
 
     def _draw_sidebar(self, state):
+        self.display.fill(self.config.colors.BACKGROUND, self.sidebar_rect)
         x_offset = self.config.map_width_px + 10
         y = 10
         
-        title = self.font_bold.render(f"Iteration: {state.global_stats.total_iterations}", True, self.config.colors.TEXT)
-        self.display.blit(title, (x_offset, y))
+        self.display.blit(self._text(f"Iteration: {state.global_stats.total_iterations}", self.config.colors.TEXT, True), (x_offset, y))
         y += 25
         
-        deaths_txt = self.font.render(f"Total Deaths: {state.global_stats.total_deaths}", True, self.config.colors.TEXT)
-        self.display.blit(deaths_txt, (x_offset, y))
+        self.display.blit(self._text(f"Total Deaths: {state.global_stats.total_deaths}", self.config.colors.TEXT), (x_offset, y))
         y += 25
         
-        time_txt = self.font.render(f"Time: {int(state.global_stats.total_time)}s", True, self.config.colors.TEXT)
-        self.display.blit(time_txt, (x_offset, y))
+        self.display.blit(self._text(f"Time: {int(state.global_stats.total_time)}s", self.config.colors.TEXT), (x_offset, y))
         y += 35
         
         pygame.draw.line(self.display, (200,200,200), (x_offset, y), (self.config.window_width-10, y))
@@ -63,19 +116,18 @@ class PygameRenderer:
             team_conf = next((t for t in self.config.teams if t.name == name), None)
             color = team_conf.color if team_conf else (0,0,0)
             
-            header = self.font_bold.render(f"{name}", True, color)
-            self.display.blit(header, (x_offset, y))
+            self.display.blit(self._text(f"{name}", color, True), (x_offset, y))
             y += 20
             
-            self.display.blit(self.font.render(f"  Record: {stats.record}", True, self.config.colors.TEXT), (x_offset, y))
+            self.display.blit(self._text(f"  Record: {stats.record}", self.config.colors.TEXT), (x_offset, y))
             y += 18
-            self.display.blit(self.font.render(f"  Deaths: {stats.deaths}", True, self.config.colors.TEXT), (x_offset, y))
+            self.display.blit(self._text(f"  Deaths: {stats.deaths}", self.config.colors.TEXT), (x_offset, y))
             y += 18
-            self.display.blit(self.font.render(f"  Current Score: {stats.current_score}", True, self.config.colors.TEXT), (x_offset, y))
+            self.display.blit(self._text(f"  Current Score: {stats.current_score}", self.config.colors.TEXT), (x_offset, y))
             y += 18
             
             if team_conf and team_conf.brain_type == "GA":
-                self.display.blit(self.font.render(f"  Generation: {stats.generation}", True, self.config.colors.TEXT), (x_offset, y))
+                self.display.blit(self._text(f"  Generation: {stats.generation}", self.config.colors.TEXT), (x_offset, y))
                 y += 18
 
             team_snakes = [s for s in state.snakes if s.team_name == name and s.is_alive]
@@ -86,11 +138,29 @@ class PygameRenderer:
                 ratio = min(h / limit, 1.0)
                 c_val = (int(255 * ratio), int(255 * (1 - ratio)), 0)
                 
-                self.display.blit(self.font.render(f"  S{i+1} Hunger: {h}/{limit}", True, c_val), (x_offset, y))
+                self.display.blit(self._text(f"  S{i+1} Hunger: {h}/{limit}", c_val), (x_offset, y))
                 y += 16
             
             y += 14
 
+        if state.timings:
+            self._draw_timings(state.timings, x_offset, y)
+
+    def _draw_timings(self, timings, x_offset, y):
+        pygame.draw.line(self.display, (200,200,200), (x_offset, y), (self.config.window_width-10, y))
+        y += 10
+        self.display.blit(self._text("Timings (ms/tick)", self.config.colors.TEXT, True), (x_offset, y))
+        y += 20
+        for phase, ms in timings.items():
+            self.display.blit(self._text(f"  {phase}: {ms:.2f}", self.config.colors.TEXT), (x_offset, y))
+            y += 16
+
+    def tick(self, fps):
+        self.clock.tick(fps)
+
+    def close(self):
+        pygame.quit()
+
     def get_input(self):
         res = {
             'quit': False, 
@@ -102,6 +172,8 @@ class PygameRenderer:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 res['quit'] = True
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self._full_redraw = True
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     res['toggle_speed'] = True
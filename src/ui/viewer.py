@@ -0,0 +1,116 @@
+import time
+import multiprocessing as mp
+from collections import namedtuple
+import numpy as np
+from src.core.types import GameStateDTO
+
+SnakeView = namedtuple('SnakeView', 'team_name, color, is_alive, steps_since_last_food, body')
+
+def make_snapshot(state):
+    """Компактный снимок состояния для отрисовки: тела змеек как массивы int16."""
+    snakes = [
+        SnakeView(s.team_name, s.color, s.is_alive, s.steps_since_last_food,
+                  np.array(s.body, dtype=np.int16).reshape(-1, 2))
+        for s in state.snakes
+    ]
+    foods = np.array(state.foods, dtype=np.int16).reshape(-1, 2)
+    return GameStateDTO(snakes, foods, state.global_stats, state.team_stats, state.is_game_over,
+                        timings=state.timings)
+
+def _restore_snapshot(snapshot):
+    snapshot.snakes = [s._replace(body=s.body.tolist()) for s in snapshot.snakes]
+    snapshot.foods = snapshot.foods.tolist()
+    return snapshot
+
+def _run_viewer(config, conn):
+    from src.ui.pygame_ui import PygameRenderer
+    ui = PygameRenderer(config)
+    conn.send(('ready', None))
+    while True:
+        inputs = ui.get_input()
+        if any(inputs.values()):
+            conn.send(('input', inputs))
+        if inputs['quit']:
+            break
+        if conn.poll(0.005):
+            snapshot = conn.recv()
+            if snapshot is None:
+                break
+            ui.render(_restore_snapshot(snapshot))
+            conn.send(('ready', None))
+    conn.close()
+
+def _run_plotter(csv_path):
+    from src.plotter import SnakePlotter
+    SnakePlotter(csv_path)
+
+def open_plotter(csv_path):
+    """Открывает SnakePlotter в отдельном процессе, не блокируя цикл обучения."""
+    process = mp.Process(target=_run_plotter, args=(csv_path,), daemon=True)
+    process.start()
+    return process
+
+
+class ViewerProcess:
+    """Окно pygame в отдельном процессе. Кадры отправляются, только когда окно готово, иначе отбрасываются."""
+
+    def __init__(self, config):
+        self.conn, child_conn = mp.Pipe()
+        self.process = mp.Process(target=_run_viewer, args=(config, child_conn), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.dropped_frames = 0
+        self._pending = self._empty_input()
+        self._next_tick = time.perf_counter()
+
+    def _empty_input(self):
+        return {'quit': False, 'toggle_speed': False, 'save': False, 'load': False, 'toggle_graph': False}
+
+    def _drain(self):
+        try:
+            while self.conn.poll():
+                kind, payload = self.conn.recv()
+                if kind == 'ready':
+                    self.ready = True
+                elif kind == 'input':
+                    for key, value in payload.items():
+                        self._pending[key] = self._pending.get(key, False) or value
+        except (EOFError, OSError):
+            self._pending['quit'] = True
+        if not self.process.is_alive():
+            self._pending['quit'] = True
+
+    def get_input(self):
+        self._drain()
+        res, self._pending = self._pending, self._empty_input()
+        return res
+
+    def render(self, state):
+        self._drain()
+        if not self.ready:
+            self.dropped_frames += 1
+            return False
+        self.ready = False
+        try:
+            self.conn.send(make_snapshot(state))
+        except (BrokenPipeError, OSError):
+            self._pending['quit'] = True
+            return False
+        return True
+
+    def tick(self, fps):
+        # Аналог pygame.time.Clock.tick без импорта pygame в процессе обучения
+        self._next_tick = max(self._next_tick + 1.0 / fps, time.perf_counter())
+        delay = self._next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
@@ -0,0 +1,23 @@
+import numpy as np
+import torch
+from src.ai.ga_trainer import GATrainer
+from src.ai.model import SnakeNet
+
+def member_genome(member):
+    return torch.cat([w[member.idx].reshape(-1) for w in member.weights]).numpy()
+
+def test_episode_spanning_generations_keeps_weights_and_fitness():
+    ga = GATrainer(SnakeNet, population_size=4, elite=1, seed=0)
+    generation, idx = ga.next_individual()
+    member = ga.get_member(generation, idx)
+    genome = ga.population[idx].copy()
+
+    # Остальные змейки успевают сыграть три поколения, пока первая ещё в игре
+    while ga.generation < 4:
+        ga.report(*ga.next_individual(), 0.0)
+    np.testing.assert_array_equal(member_genome(member), genome)
+
+    # Поздний результат не теряется: лучшая особь проходит в следующее поколение как элита
+    assert ga.report(generation, idx, 100.0)
+    ga.evolve()
+    np.testing.assert_array_equal(ga.population[0], genome)
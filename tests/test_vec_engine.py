@@ -0,0 +1,32 @@
+import dataclasses
+import numpy as np
+from src.config import SETTINGS, TeamConfig
+from src.core.types import Cell
+from src.core.vec_engine import VecGameEngine
+
+def expected_grid(engine):
+    """Сетка, собранная заново из кольцевых буферов тел и списка еды."""
+    grid = np.full(engine.grid.shape, Cell.EMPTY, dtype=np.int32)
+    for n in range(engine.num_envs):
+        for k in range(engine.num_snakes):
+            for j in range(engine.length[n, k]):
+                x, y = engine.body[n, k, (engine.head_ptr[n, k] - j) % engine.capacity]
+                assert grid[n, x, y] == Cell.EMPTY
+                grid[n, x, y] = k + 1
+        for x, y in engine.foods[n]:
+            if x >= 0:
+                assert grid[n, x, y] == Cell.EMPTY
+                grid[n, x, y] = Cell.FOOD
+    return grid
+
+def test_crowded_board_grid_matches_bodies_and_food():
+    config = dataclasses.replace(
+        SETTINGS, grid_width=9, grid_height=7, initial_snake_length=4, stats_enabled=False,
+        teams=[TeamConfig("Crowd", 8, (0, 200, 0))],
+    )
+    engine = VecGameEngine(config, num_envs=8, seed=0)
+    rng = np.random.default_rng(0)
+    np.testing.assert_array_equal(engine.grid, expected_grid(engine))
+    for _ in range(300):
+        engine.step(rng.integers(0, 3, size=(engine.num_envs, engine.num_snakes)))
+        np.testing.assert_array_equal(engine.grid, expected_grid(engine))